@@ -1,13 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from battle_simulator import BattleSimulator, Pokemon
+from battle_simulator import POLICIES, BattleSimulator, Pokemon
 import threading
 import time
 from PIL import Image, ImageTk
 import requests
 import io
 import os
-import random
 
 class PokemonBattleGUI:
     def __init__(self, root):
@@ -58,9 +57,16 @@ class PokemonBattleGUI:
         self.pokemon2_combo.grid(row=0, column=3, padx=5)
         self.pokemon2_combo.set(pokemon_names[1])
         
+        # How both Pokemon pick their moves
+        ttk.Label(selection_frame, text="Moves:").grid(row=0, column=4, padx=5)
+        self.policy_var = tk.StringVar(value=POLICIES[0])
+        self.policy_combo = ttk.Combobox(selection_frame, textvariable=self.policy_var,
+                                         values=POLICIES, state='readonly', width=8)
+        self.policy_combo.grid(row=0, column=5, padx=5)
+        
         # Start battle button
         self.start_button = ttk.Button(selection_frame, text="Start Battle", command=self.start_battle)
-        self.start_button.grid(row=0, column=4, padx=5)
+        self.start_button.grid(row=0, column=6, padx=5)
 
     def create_battle_frame(self):
         """Create the battle display interface"""
@@ -128,9 +134,7 @@ class PokemonBattleGUI:
             image = Image.open(image_path)
         else:
             # Get Pokemon ID from the dataset
-            pokemon_id = self.simulator.pokemon_data[
-                self.simulator.pokemon_data['name'] == pokemon_name
-            ].index[0] + 1
+            pokemon_id = self.simulator.pokemon_store.get(pokemon_name)['pokedex_number']
             
             # Download image from PokeAPI
             url = f'https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon_id}.png'
@@ -185,20 +189,16 @@ class PokemonBattleGUI:
         # Start battle in separate thread
         battle_thread = threading.Thread(
             target=self.run_battle,
-            args=(pokemon1_name, pokemon2_name)
+            args=(pokemon1_name, pokemon2_name, self.policy_var.get())
         )
         battle_thread.start()
 
-    def run_battle(self, pokemon1_name, pokemon2_name):
+    def run_battle(self, pokemon1_name, pokemon2_name, policy='random'):
         """Run the battle simulation"""
         try:
             # Initialize Pokemon
-            pokemon1_data = self.simulator.pokemon_data[
-                self.simulator.pokemon_data['name'] == pokemon1_name
-            ].iloc[0]
-            pokemon2_data = self.simulator.pokemon_data[
-                self.simulator.pokemon_data['name'] == pokemon2_name
-            ].iloc[0]
+            pokemon1_data = self.simulator.pokemon_store.get(pokemon1_name)
+            pokemon2_data = self.simulator.pokemon_store.get(pokemon2_name)
             
             pokemon1 = Pokemon(pokemon1_name, pokemon1_data)
             pokemon2 = Pokemon(pokemon2_name, pokemon2_data)
@@ -208,12 +208,11 @@ class PokemonBattleGUI:
             while pokemon1.current_hp > 0 and pokemon2.current_hp > 0:
                 self.update_battle_log(f"\nTurn {turn}")
                 
-                # Determine turn order
-                first = pokemon1 if pokemon1.speed >= pokemon2.speed else pokemon2
-                second = pokemon2 if first == pokemon1 else pokemon1
+                # Determine turn order (speed stages and paralysis included)
+                first, second = self.simulator.turn_order(pokemon1, pokemon2)
                 
                 # First Pokemon's turn
-                self.simulate_turn(first, second)
+                self.simulate_turn(first, second, policy)
                 self.update_pokemon_display(pokemon1, pokemon2)
                 time.sleep(1)  # Add delay for readability
                 
@@ -222,7 +221,7 @@ class PokemonBattleGUI:
                     break
                 
                 # Second Pokemon's turn
-                self.simulate_turn(second, first)
+                self.simulate_turn(second, first, policy)
                 self.update_pokemon_display(pokemon1, pokemon2)
                 time.sleep(1)  # Add delay for readability
                 
@@ -230,29 +229,32 @@ class PokemonBattleGUI:
                     self.update_battle_log(f"\n{second.name} wins!")
                     break
                 
+                # End-of-turn status damage
+                self.simulator.end_of_turn(first, self.update_battle_log)
+                self.simulator.end_of_turn(second, self.update_battle_log)
+                self.update_pokemon_display(pokemon1, pokemon2)
+                
+                if first.current_hp <= 0 and second.current_hp <= 0:
+                    self.update_battle_log("\nBoth Pokemon fainted! It's a draw!")
+                    break
+                if first.current_hp <= 0 or second.current_hp <= 0:
+                    winner = first if first.current_hp > 0 else second
+                    self.update_battle_log(f"\n{winner.name} wins!")
+                    break
+                
                 turn += 1
         
         finally:
             # Re-enable start button
             self.root.after(0, lambda: self.start_button.state(['!disabled']))
 
-    def simulate_turn(self, attacker, defender):
+    def simulate_turn(self, attacker, defender, policy='random'):
         """Simulate one turn of the battle"""
-        # Select random move
-        move = self.simulator.moves_database[
-            random.choice(list(self.simulator.moves_database.keys()))
-        ]
-        
-        self.update_battle_log(f"{attacker.name} used {move.name}!")
+        # Select a move, at random or greedily
+        move = self.simulator.choose_move(attacker, defender, policy=policy)
         
-        # Calculate and apply damage
-        damage = self.simulator.calculate_damage(attacker, defender, move)
-        defender.current_hp = max(0, defender.current_hp - damage)
-        
-        self.update_battle_log(
-            f"{defender.name} took {damage} damage! "
-            f"({defender.current_hp}/{defender.max_hp} HP remaining)"
-        )
+        # Status checks, damage and secondary effects
+        self.simulator.use_move(attacker, defender, move, self.update_battle_log)
 
 def main():
     root = tk.Tk()
@@ -1,110 +1,424 @@
 import pandas as pd
 import numpy as np
-import random
+import os
+import sys
+
+# Share the type chart and data store with the Pokedex app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PokeDex by Jordy Danen'))
+from app.utils.type_index import NO_TYPE, TYPE_NAMES, effectiveness, type_code
+from app.utils.rng import make_rng
+from app.utils.result_cache import ResultCache
+from app.data.pokemon_data import PokemonRecord, PokemonStore, load_pokemon_data
+from app.data.move_data import CATEGORIES, PHYSICAL, SPECIAL, MoveTable, get_move_table
+
+# Stats that have a stage, as indexes into Pokemon.stages
+ATTACK, DEFENSE, SP_ATTACK, SP_DEFENSE, SPEED = range(5)
+STAGE_STATS = {'attack': ATTACK, 'defense': DEFENSE, 'sp_attack': SP_ATTACK,
+               'sp_defense': SP_DEFENSE, 'speed': SPEED}
+
+# Multiplier for each stat stage from -6 to +6, indexed by stage + 6
+STAGE_MULTIPLIERS = tuple(max(2, 2 + stage) / max(2, 2 - stage) for stage in range(-6, 7))
+
+# Turns after which a headless battle is called a draw
+MAX_TURNS = 100
+
+# How a side picks its moves: at random, or the move most likely to knock
+# the defender out this turn (ties broken by expected damage)
+POLICIES = ('random', 'greedy')
+
+class StatusCondition:
+    """Behaviour of a major status condition, as one row of STATUS_CONDITIONS.
+
+    Before moving, a Pokemon asleep counts down its sleep turns. Otherwise it
+    is cured with cure_chance or loses its turn with skip_chance. The
+    residual fraction of max HP is lost at the end of every turn, and
+    physical damage and speed are scaled by their multipliers.
+    """
+    __slots__ = ('name', 'skip_chance', 'cure_chance', 'sleep_turns', 'residual_fraction',
+                 'physical_multiplier', 'speed_multiplier', 'immune_types',
+                 'inflicted_message', 'skip_message', 'cured_message', 'residual_message')
+
+    def __init__(self, name: str, skip_chance: float = 0.0, cure_chance: float = 0.0,
+                 sleep_turns: tuple = None, residual_fraction: float = 0.0,
+                 physical_multiplier: float = 1.0, speed_multiplier: float = 1.0,
+                 immune_types: tuple = (), inflicted_message: str = '', skip_message: str = '',
+                 cured_message: str = '', residual_message: str = ''):
+        self.name = name
+        self.skip_chance = skip_chance
+        self.cure_chance = cure_chance
+        self.sleep_turns = sleep_turns
+        self.residual_fraction = residual_fraction
+        self.physical_multiplier = physical_multiplier
+        self.speed_multiplier = speed_multiplier
+        self.immune_types = frozenset(type_code(t) for t in immune_types)
+        self.inflicted_message = inflicted_message
+        self.skip_message = skip_message
+        self.cured_message = cured_message
+        self.residual_message = residual_message
+
+STATUS_CONDITIONS = {
+    'burn': StatusCondition('burn', residual_fraction=1 / 16, physical_multiplier=0.5,
+                            immune_types=('fire',), inflicted_message="{} was burned!",
+                            residual_message="{} is hurt by its burn!"),
+    'poison': StatusCondition('poison', residual_fraction=1 / 8, immune_types=('poison', 'steel'),
+                              inflicted_message="{} was poisoned!",
+                              residual_message="{} is hurt by poison!"),
+    'paralysis': StatusCondition('paralysis', skip_chance=0.25, speed_multiplier=0.5,
+                                 immune_types=('electric',),
+                                 inflicted_message="{} is paralyzed! It may be unable to move!",
+                                 skip_message="{} is paralyzed! It can't move!"),
+    'sleep': StatusCondition('sleep', sleep_turns=(1, 3), inflicted_message="{} fell asleep!",
+                             skip_message="{} is fast asleep.", cured_message="{} woke up!"),
+    'freeze': StatusCondition('freeze', skip_chance=1.0, cure_chance=0.2, immune_types=('ice',),
+                              inflicted_message="{} was frozen solid!",
+                              skip_message="{} is frozen solid!", cured_message="{} thawed out!"),
+}
+
+# Stat names used in battle messages, indexed by ATTACK ... SPEED
+STAGE_LABELS = ('Attack', 'Defense', 'Sp. Atk', 'Sp. Def', 'Speed')
 
 class Pokemon:
-    def __init__(self, name: str, data: pd.Series):
+    __slots__ = ('name', 'max_hp', 'current_hp', 'attack', 'defense', 'sp_attack', 'sp_defense',
+                 'speed', 'type1', 'type2', 'type1_code', 'type2_code', 'status', 'status_counter',
+                 'condition', 'residual_damage', 'physical_multiplier', 'speed_multiplier', 'stages')
+
+    def __init__(self, name: str, data: PokemonRecord):
         self.name = name
-        self.max_hp = data['hp']
-        self.current_hp = data['hp']
-        self.attack = data['attack']
-        self.defense = data['defense']
-        self.sp_attack = data['sp_attack']
-        self.sp_defense = data['sp_defense']
-        self.speed = data['speed']
+        self.max_hp = int(data['hp'])
+        self.current_hp = self.max_hp
+        self.attack = int(data['attack'])
+        self.defense = int(data['defense'])
+        self.sp_attack = int(data['sp_attack'])
+        self.sp_defense = int(data['sp_defense'])
+        self.speed = int(data['speed'])
         self.type1 = data['type1']
         self.type2 = data['type2'] if pd.notna(data['type2']) else None
+        self.type1_code = type_code(self.type1)
+        self.type2_code = type_code(self.type2)
+        
+        # Stat stages from -6 to +6, indexed by ATTACK ... SPEED
+        self.stages = [0, 0, 0, 0, 0]
         
         # Status conditions
-        self.status = None  # Can be: burn, freeze, paralysis, poison, sleep
+        self.clear_status()
+
+    def stage_multiplier(self, stat: int) -> float:
+        return STAGE_MULTIPLIERS[self.stages[stat] + 6]
+
+    def set_status(self, condition: StatusCondition, sleep_turns: int = 0) -> None:
+        # Effects that apply every turn are worked out once, here
+        self.status = condition.name  # Can be: burn, freeze, paralysis, poison, sleep
+        self.status_counter = sleep_turns
+        self.condition = condition
+        self.residual_damage = max(1, int(self.max_hp * condition.residual_fraction)) if condition.residual_fraction else 0
+        self.physical_multiplier = condition.physical_multiplier
+        self.speed_multiplier = condition.speed_multiplier
+
+    def clear_status(self) -> None:
+        self.status = None
         self.status_counter = 0
-        
-        # Stat modifiers
-        self.modifiers = {
-            'attack': 1.0,
-            'defense': 1.0,
-            'sp_attack': 1.0,
-            'sp_defense': 1.0,
-            'speed': 1.0
-        }
+        self.condition = None
+        self.residual_damage = 0
+        self.physical_multiplier = 1.0
+        self.speed_multiplier = 1.0
+
+    def effective_speed(self) -> float:
+        return self.speed * STAGE_MULTIPLIERS[self.stages[SPEED] + 6] * self.speed_multiplier
 
 class Move:
-    def __init__(self, name: str, type: str, power: int, accuracy: int, category: str):
+    __slots__ = ('name', 'type', 'type_code', 'power', 'accuracy', 'category', 'is_physical',
+                 'status', 'status_chance', 'stat_changes')
+
+    def __init__(self, name: str, type: str, power: int, accuracy: int, category: str,
+                 status: str = None, status_chance: int = 0, stat_changes: tuple = ()):
         self.name = name
         self.type = type
+        self.type_code = type_code(type)
         self.power = power
         self.accuracy = accuracy
-        self.category = category  # 'physical' or 'special'
+        self.category = category  # 'physical', 'special' or 'status'
+        self.is_physical = category == 'physical'
+        
+        # Secondary effects: a status inflicted on the target with status_chance
+        # percent, and (stat, stages, on_user) stage changes
+        self.status = STATUS_CONDITIONS[status] if status else None
+        self.status_chance = status_chance
+        self.stat_changes = stat_changes
+
+    @classmethod
+    def from_table(cls, table: MoveTable, index: int) -> 'Move':
+        return cls(table.names[index], TYPE_NAMES[table.types[index]], int(table.power[index]),
+                   int(table.accuracy[index]), CATEGORIES[table.categories[index]],
+                   table.effects[index], int(table.effect_chances[index]),
+                   tuple((STAGE_STATS[stat], stages, on_user)
+                         for stat, stages, on_user in table.stat_changes[index]))
 
 class BattleSimulator:
-    def __init__(self):
+    def __init__(self, seed=None, data_path: str = '../pokemon.csv', greedy_cache_size: int = 256):
+        # Random stream for moves, critical hits and damage rolls; seed may be
+        # an int, a SeedSequence or a numpy Generator
+        self.rng = make_rng(seed)
+        
         # Load Pokemon data
-        self.pokemon_data = pd.read_csv('../pokemon.csv')
-        
-        # Type effectiveness chart
-        self.type_chart = {
-            'normal': {'normal': 1, 'fire': 1, 'water': 1, 'electric': 1, 'grass': 1, 'ice': 1, 'fighting': 1, 
-                      'poison': 1, 'ground': 1, 'flying': 1, 'psychic': 1, 'bug': 1, 'rock': 0.5, 'ghost': 0, 
-                      'dragon': 1, 'dark': 1, 'steel': 0.5},
-            'fire': {'normal': 1, 'fire': 0.5, 'water': 0.5, 'electric': 1, 'grass': 2, 'ice': 2, 'fighting': 1,
-                    'poison': 1, 'ground': 1, 'flying': 1, 'psychic': 1, 'bug': 2, 'rock': 0.5, 'ghost': 1,
-                    'dragon': 0.5, 'dark': 1, 'steel': 2},
-            'water': {'normal': 1, 'fire': 2, 'water': 0.5, 'electric': 1, 'grass': 0.5, 'ice': 1, 'fighting': 1,
-                     'poison': 1, 'ground': 2, 'flying': 1, 'psychic': 1, 'bug': 1, 'rock': 2, 'ghost': 1,
-                     'dragon': 0.5, 'dark': 1, 'steel': 1},
-            'electric': {'normal': 1, 'fire': 1, 'water': 2, 'electric': 0.5, 'grass': 0.5, 'ice': 1, 'fighting': 1,
-                        'poison': 1, 'ground': 0, 'flying': 2, 'psychic': 1, 'bug': 1, 'rock': 1, 'ghost': 1,
-                        'dragon': 0.5, 'dark': 1, 'steel': 1},
-            'grass': {'normal': 1, 'fire': 0.5, 'water': 2, 'electric': 1, 'grass': 0.5, 'ice': 1, 'fighting': 1,
-                     'poison': 0.5, 'ground': 2, 'flying': 0.5, 'psychic': 1, 'bug': 0.5, 'rock': 2, 'ghost': 1,
-                     'dragon': 0.5, 'dark': 1, 'steel': 0.5},
-            'ice': {'normal': 1, 'fire': 0.5, 'water': 0.5, 'electric': 1, 'grass': 2, 'ice': 0.5, 'fighting': 1,
-                   'poison': 1, 'ground': 2, 'flying': 2, 'psychic': 1, 'bug': 1, 'rock': 1, 'ghost': 1,
-                   'dragon': 2, 'dark': 1, 'steel': 0.5}
-        }
-        
-        # Define moves database
-        self.moves_database = {
-            'Thunderbolt': Move('Thunderbolt', 'electric', 90, 100, 'special'),
-            'Flamethrower': Move('Flamethrower', 'fire', 90, 100, 'special'),
-            'Ice Beam': Move('Ice Beam', 'ice', 90, 100, 'special'),
-            'Close Combat': Move('Close Combat', 'fighting', 120, 100, 'physical'),
-            'Earthquake': Move('Earthquake', 'ground', 100, 100, 'physical'),
-            'Dragon Claw': Move('Dragon Claw', 'dragon', 80, 100, 'physical'),
-        }
+        self.pokemon_data = load_pokemon_data(data_path)
+        self.pokemon_store = PokemonStore(self.pokemon_data)
+        
+        # Moves database, from the shared move table (moves.csv)
+        self.move_table = get_move_table()
+        self.move_list = [Move.from_table(self.move_table, i) for i in range(len(self.move_table))]
+        self.moves_database = {move.name: move for move in self.move_list}
+        
+        # Moves of each type, indexed by type code
+        self.moves_by_type = [[self.move_list[i] for i in moves] for moves in self.move_table.by_type]
+        
+        # Physical and special moves, the ones greedy picks from by default
+        damaging = np.sort(np.concatenate([self.move_table.by_category[PHYSICAL],
+                                           self.move_table.by_category[SPECIAL]]))
+        self.damaging_moves = [self.move_list[i] for i in damaging]
+        
+        # Greedy move tables, by matchup, move list and the stages and burn they
+        # depend on; only the greedy_cache_size most recently used are kept
+        self.greedy_tables = ResultCache(greedy_cache_size)
+
+    def random_move(self, moves: list = None) -> Move:
+        moves = moves or self.move_list
+        return moves[self.rng.integers(len(moves))]
+
+    def random_move_for(self, pokemon: Pokemon) -> Move:
+        """Get a random move of a random one of the Pokemon's types."""
+        codes = [code for code in (pokemon.type1_code, pokemon.type2_code) if code != NO_TYPE]
+        return self.random_move(self.moves_by_type[codes[self.rng.integers(len(codes))]])
+
+    def damage_tables(self, attacker: Pokemon, defender: Pokemon, moves: list) -> tuple:
+        """Get (expected damage, KO probability) of every move against the defender.
+
+        KO probability is a (move, defender HP) array over every HP the
+        defender can have, with critical hits, the damage roll and both of
+        calculate_damage's truncations included, so it is exact. Expected
+        damage only breaks ties and leaves the truncations out, so it is
+        high by less than 2 HP.
+        """
+        power = np.array([move.power for move in moves], dtype=float)
+        physical = np.array([move.is_physical for move in moves])
+        accuracy = np.minimum([move.accuracy for move in moves], 100) / 100
+        move_types = np.array([move.type_code for move in moves])
+        
+        attack = np.where(physical, attacker.attack * attacker.stage_multiplier(ATTACK),
+                          attacker.sp_attack * attacker.stage_multiplier(SP_ATTACK))
+        defense = np.where(physical, defender.defense * defender.stage_multiplier(DEFENSE),
+                           defender.sp_defense * defender.stage_multiplier(SP_DEFENSE))
+        stab = np.where((move_types == attacker.type1_code) | (move_types == attacker.type2_code), 1.5, 1.0)
+        burn = np.where(physical, attacker.physical_multiplier, 1.0)
+        
+        # Same formula as calculate_damage, before the critical hit, random factor and burn
+        base = (((2 * 50 / 5 + 2) * power * attack / defense / 50) + 2) * np.where(power > 0, 1.0, 0.0)
+        base *= effectiveness(move_types, defender.type1_code, defender.type2_code) * stab
+        
+        # calculate_damage deals int(int(x * roll) * burn) with the roll uniform
+        # on [0.85, 1.0]. That is at least hp once int(x * roll) reaches
+        # ceil(hp / burn), which x * roll does with chance (x - needed) / (0.15 x)
+        hp = np.arange(defender.max_hp + 1)
+        needed = np.ceil(hp / burn[:, None])
+        ko_probability = np.zeros((len(moves), len(hp)))
+        for critical, chance in ((1.0, 15 / 16), (1.5, 1 / 16)):
+            damage = base[:, None] * critical
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ko_probability += chance * np.where(damage > 0, np.clip((damage - needed) / (0.15 * damage), 0, 1),
+                                                    needed <= 0)
+        ko_probability *= accuracy[:, None]
+        expected_damage = accuracy * base * burn * 0.925 * (15 / 16 + 1.5 / 16)
+        return expected_damage, ko_probability
+
+    def greedy_move(self, attacker: Pokemon, defender: Pokemon, moves: list = None) -> Move:
+        """Get the move most likely to knock the defender out this turn, else the hardest hitting one.
+
+        The best move for every defender HP is worked out once per matchup,
+        for the attacker's current attack stages and burn, so a turn's choice is a lookup.
+        """
+        moves = moves or self.damaging_moves
+        key = (attacker.name, defender.name, tuple(moves), attacker.stages[ATTACK], attacker.stages[SP_ATTACK],
+               defender.stages[DEFENSE], defender.stages[SP_DEFENSE], attacker.physical_multiplier)
+        best_moves = self.greedy_tables.get_or_compute(key, lambda: self.best_moves(attacker, defender, moves))
+        return moves[best_moves[defender.current_hp]]
+
+    def best_moves(self, attacker: Pokemon, defender: Pokemon, moves: list) -> np.ndarray:
+        """Get greedy_move's choice, as an index into moves, for every defender HP."""
+        expected_damage, ko_probability = self.damage_tables(attacker, defender, moves)
+        expected_damage = np.broadcast_to(expected_damage[:, None], ko_probability.shape)
+        return np.lexsort((expected_damage, ko_probability), axis=0)[-1]
+
+    def choose_move(self, attacker: Pokemon, defender: Pokemon, moves: list = None,
+                    policy: str = 'random') -> Move:
+        if policy == 'greedy':
+            return self.greedy_move(attacker, defender, moves)
+        if policy == 'random':
+            return self.random_move(moves) if moves else self.random_move_for(attacker)
+        raise ValueError(f"Unknown move policy: {policy}")
 
     def calculate_damage(self, attacker: Pokemon, defender: Pokemon, move: Move) -> int:
         # Base damage formula
-        if move.category == 'physical':
-            attack = attacker.attack * attacker.modifiers['attack']
-            defense = defender.defense * defender.modifiers['defense']
+        if move.is_physical:
+            attack = attacker.attack * STAGE_MULTIPLIERS[attacker.stages[ATTACK] + 6]
+            defense = defender.defense * STAGE_MULTIPLIERS[defender.stages[DEFENSE] + 6]
         else:
-            attack = attacker.sp_attack * attacker.modifiers['sp_attack']
-            defense = defender.sp_defense * defender.modifiers['sp_defense']
+            attack = attacker.sp_attack * STAGE_MULTIPLIERS[attacker.stages[SP_ATTACK] + 6]
+            defense = defender.sp_defense * STAGE_MULTIPLIERS[defender.stages[SP_DEFENSE] + 6]
 
         # Calculate base damage
         level = 50  # Assuming level 50 for all Pokemon
         base_damage = ((2 * level / 5 + 2) * move.power * attack / defense / 50) + 2
 
         # Type effectiveness
-        type_multiplier = self.calculate_type_effectiveness(move.type, defender.type1, defender.type2)
+        type_multiplier = float(effectiveness(move.type_code, defender.type1_code, defender.type2_code))
         
         # STAB (Same Type Attack Bonus)
-        stab = 1.5 if move.type in [attacker.type1, attacker.type2] else 1.0
+        stab = 1.5 if move.type_code in (attacker.type1_code, attacker.type2_code) else 1.0
         
-        # Critical hit (1/16 chance)
-        critical = 1.5 if random.random() < 0.0625 else 1.0
-        
-        # Random factor (0.85 to 1.00)
-        random_factor = random.uniform(0.85, 1.00)
+        # Critical hit (1/16 chance) and random factor (0.85 to 1.00), drawn together
+        critical_roll, damage_roll = self.rng.random(2).tolist()
+        critical = 1.5 if critical_roll < 0.0625 else 1.0
+        random_factor = 0.85 + 0.15 * damage_roll
         
         # Calculate final damage
         final_damage = int(base_damage * type_multiplier * stab * critical * random_factor)
         
+        # Burn halves physical damage
+        if move.is_physical and attacker.physical_multiplier != 1.0:
+            final_damage = int(final_damage * attacker.physical_multiplier)
+        
         return final_damage
 
     def calculate_type_effectiveness(self, move_type: str, defender_type1: str, defender_type2: str = None) -> float:
-        effectiveness = self.type_chart.get(move_type, {}).get(defender_type1, 1.0)
-        if defender_type2 and pd.notna(defender_type2):
-            effectiveness *= self.type_chart.get(move_type, {}).get(defender_type2, 1.0)
-        return effectiveness 
+        return float(effectiveness(type_code(move_type), type_code(defender_type1), type_code(defender_type2)))
+
+    # Turn resolution. Every step takes an optional log(message) callable;
+    # without one no messages are formatted at all.
+
+    def turn_order(self, pokemon1: Pokemon, pokemon2: Pokemon) -> tuple:
+        if pokemon1.effective_speed() >= pokemon2.effective_speed():
+            return pokemon1, pokemon2
+        return pokemon2, pokemon1
+
+    def can_move(self, pokemon: Pokemon, log=None) -> bool:
+        """Apply the before-move step of the Pokemon's status, if it has one."""
+        condition = pokemon.condition
+        if condition is None:
+            return True
+        
+        if condition.sleep_turns:
+            pokemon.status_counter -= 1
+            if pokemon.status_counter > 0:
+                if log:
+                    log(condition.skip_message.format(pokemon.name))
+                return False
+            cured = True
+        else:
+            roll = self.rng.random()
+            cured = roll < condition.cure_chance
+            if not cured and roll < condition.skip_chance:
+                if log:
+                    log(condition.skip_message.format(pokemon.name))
+                return False
+        
+        if cured:
+            if log:
+                log(condition.cured_message.format(pokemon.name))
+            pokemon.clear_status()
+        return True
+
+    def inflict_status(self, pokemon: Pokemon, condition: StatusCondition, log=None) -> bool:
+        """Give a Pokemon a status unless it already has one or its type is immune."""
+        if (pokemon.status is not None or pokemon.current_hp <= 0
+                or pokemon.type1_code in condition.immune_types or pokemon.type2_code in condition.immune_types):
+            return False
+        sleep_turns = 0
+        if condition.sleep_turns:
+            low, high = condition.sleep_turns
+            sleep_turns = int(self.rng.integers(low, high + 1)) + 1  # Counted down before each move
+        pokemon.set_status(condition, sleep_turns)
+        if log:
+            log(condition.inflicted_message.format(pokemon.name))
+        return True
+
+    def change_stages(self, pokemon: Pokemon, stat: int, stages: int, log=None) -> None:
+        old = pokemon.stages[stat]
+        new = max(-6, min(6, old + stages))
+        pokemon.stages[stat] = new
+        if log:
+            if new == old:
+                log(f"{pokemon.name}'s {STAGE_LABELS[stat]} won't go any {'higher' if stages > 0 else 'lower'}!")
+            elif stages > 0:
+                log(f"{pokemon.name}'s {STAGE_LABELS[stat]} {'rose' if new - old == 1 else 'sharply rose'}!")
+            else:
+                log(f"{pokemon.name}'s {STAGE_LABELS[stat]} {'fell' if old - new == 1 else 'harshly fell'}!")
+
+    def use_move(self, attacker: Pokemon, defender: Pokemon, move: Move, log=None) -> int:
+        """Resolve one move, including its secondary effects; returns the damage dealt."""
+        if not self.can_move(attacker, log):
+            return 0
+        if log:
+            log(f"{attacker.name} used {move.name}!")
+        if move.accuracy < 100 and self.rng.random() * 100 >= move.accuracy:
+            if log:
+                log(f"{attacker.name}'s attack missed!")
+            return 0
+        
+        damage = 0
+        if move.power:
+            damage = self.calculate_damage(attacker, defender, move)
+            defender.current_hp = max(0, defender.current_hp - damage)
+            if log:
+                log(f"{defender.name} took {damage} damage! "
+                    f"({defender.current_hp}/{defender.max_hp} HP remaining)")
+        
+        if move.status is not None and (move.status_chance >= 100 or self.rng.random() * 100 < move.status_chance):
+            if not self.inflict_status(defender, move.status, log) and not move.power and log:
+                log("But it failed!")
+        for stat, stages, on_user in move.stat_changes:
+            self.change_stages(attacker if on_user else defender, stat, stages, log)
+        return damage
+
+    def end_of_turn(self, pokemon: Pokemon, log=None) -> None:
+        """Apply the precomputed end-of-turn damage of the Pokemon's status."""
+        if pokemon.residual_damage and pokemon.current_hp > 0:
+            pokemon.current_hp = max(0, pokemon.current_hp - pokemon.residual_damage)
+            if log:
+                log(pokemon.condition.residual_message.format(pokemon.name))
+
+    def resolve_turn(self, pokemon1: Pokemon, pokemon2: Pokemon, move1: Move = None,
+                     move2: Move = None, log=None) -> None:
+        """Play one full turn; moves that are not given are random moves of the Pokemon's types."""
+        move1 = move1 or self.random_move_for(pokemon1)
+        move2 = move2 or self.random_move_for(pokemon2)
+        first, second = self.turn_order(pokemon1, pokemon2)
+        first_move, second_move = (move1, move2) if first is pokemon1 else (move2, move1)
+        
+        self.use_move(first, second, first_move, log)
+        if second.current_hp > 0:
+            self.use_move(second, first, second_move, log)
+        
+        self.end_of_turn(first, log)
+        self.end_of_turn(second, log)
+
+    def simulate_battle(self, pokemon1_name: str, pokemon2_name: str, moves: list = None,
+                        max_turns: int = MAX_TURNS, log=None, policy: str = 'random') -> tuple:
+        """Play a whole battle with moves picked from moves by policy.
+
+        Without moves, random picks a move of one of the Pokemon's own types
+        and greedy picks from every physical and special move.
+
+        Returns (winner name, turns played); the winner is None for a draw.
+        """
+        pokemon1 = Pokemon(pokemon1_name, self.pokemon_store.get(pokemon1_name))
+        pokemon2 = Pokemon(pokemon2_name, self.pokemon_store.get(pokemon2_name))
+        
+        for turn in range(1, max_turns + 1):
+            self.resolve_turn(pokemon1, pokemon2, self.choose_move(pokemon1, pokemon2, moves, policy),
+                              self.choose_move(pokemon2, pokemon1, moves, policy), log)
+            if pokemon1.current_hp <= 0 or pokemon2.current_hp <= 0:
+                if pokemon1.current_hp > 0:
+                    return pokemon1.name, turn
+                if pokemon2.current_hp > 0:
+                    return pokemon2.name, turn
+                return None, turn
+        return None, max_turns
@@ -0,0 +1,108 @@
+"""Micro-benchmark of what each battle mechanic costs.
+
+Plays the same headless battles with a move set that has no secondary
+effects, then once per mechanic with that mechanic forced on: both Pokemon
+start with the status condition, or every move also raises the user's
+Attack. Reports battles per second, microseconds per turn (setting up the
+Pokemon not included) and the change in microseconds per turn against the
+baseline, so the cost of a mechanic can be told apart from it making battles
+longer. A separate logged pass counts how
+often each mechanic fired, to check that it really was exercised.
+
+    python benchmark.py [battles per mechanic]
+"""
+import sys
+import time
+from battle_simulator import ATTACK, MAX_TURNS, BattleSimulator, Move, Pokemon, STATUS_CONDITIONS
+from app.utils.rng import make_rng
+
+PAIRS = [('Pikachu', 'Charmander'), ('Mewtwo', 'Mew'), ('Snorlax', 'Gengar'),
+         ('Blastoise', 'Venusaur'), ('Dragonite', 'Tyranitar')]
+
+# Text in the battle log that shows each mechanic firing
+MECHANIC_MESSAGES = {
+    'burn': 'hurt by its burn',
+    'poison': 'hurt by poison',
+    'paralysis': "paralyzed! It can't move",
+    'sleep': 'fast asleep',
+    'freeze': 'frozen solid!',
+    'stat stages': "'s Attack ",
+}
+
+def plain_moves(simulator):
+    """The simulator's damaging moves with every secondary effect removed."""
+    return [Move(m.name, m.type, m.power, m.accuracy, m.category)
+            for m in simulator.move_list if m.power]
+
+def mechanic_setups(simulator):
+    """(mechanic, move list, status given to both Pokemon) triples, starting with the plain baseline."""
+    base = plain_moves(simulator)
+    setups = [('baseline', base, None)]
+    for status in STATUS_CONDITIONS:
+        setups.append((status, base, STATUS_CONDITIONS[status]))
+    boosting = [Move(m.name, m.type, m.power, m.accuracy, m.category, stat_changes=((ATTACK, 1, True),))
+                for m in base]
+    setups.append(('stat stages', boosting, None))
+    return setups
+
+def setup(simulator, pokemon1_name, pokemon2_name, condition=None) -> tuple:
+    """Create both Pokemon, starting in condition if one is given."""
+    pokemon1 = Pokemon(pokemon1_name, simulator.pokemon_store.get(pokemon1_name))
+    pokemon2 = Pokemon(pokemon2_name, simulator.pokemon_store.get(pokemon2_name))
+    if condition is not None:
+        # Types immune to the condition just play without it
+        simulator.inflict_status(pokemon1, condition)
+        simulator.inflict_status(pokemon2, condition)
+    return pokemon1, pokemon2
+
+def play(simulator, pokemon1, pokemon2, moves, log=None) -> int:
+    """Play one battle like simulate_battle; returns the turns played."""
+    for turn in range(1, MAX_TURNS + 1):
+        simulator.resolve_turn(pokemon1, pokemon2, simulator.random_move(moves), simulator.random_move(moves), log)
+        if pokemon1.current_hp <= 0 or pokemon2.current_hp <= 0:
+            return turn
+    return MAX_TURNS
+
+def count_triggers(simulator, mechanic, moves, condition, battles, seed) -> float:
+    """Play logged battles and count how often the mechanic fired per battle."""
+    message = MECHANIC_MESSAGES.get(mechanic)
+    if message is None:
+        return 0.0
+    fired = 0
+
+    def log(text):
+        nonlocal fired
+        fired += message in text
+
+    simulator.rng = make_rng(seed)
+    for i in range(battles):
+        play(simulator, *setup(simulator, *PAIRS[i % len(PAIRS)], condition), moves, log)
+    return fired / battles
+
+def run(battles: int = 2000, seed: int = 0):
+    simulator = BattleSimulator(seed)
+    print(f"{'mechanic':<12} {'battles/s':>10} {'turns/battle':>13} {'us/turn':>8} "
+          f"{'vs base':>8} {'fired/battle':>13}")
+    baseline_us = None
+    for mechanic, moves, condition in mechanic_setups(simulator):
+        # Every mechanic gets the same random stream
+        simulator.rng = make_rng(seed)
+        turns = 0
+        turn_time = 0.0
+        start = time.perf_counter()
+        for i in range(battles):
+            pokemon1, pokemon2 = setup(simulator, *PAIRS[i % len(PAIRS)], condition)
+            turns_start = time.perf_counter()
+            turns += play(simulator, pokemon1, pokemon2, moves)
+            turn_time += time.perf_counter() - turns_start
+        elapsed = time.perf_counter() - start
+
+        us_per_turn = turn_time / turns * 1e6
+        if baseline_us is None:
+            baseline_us = us_per_turn
+        fired = count_triggers(simulator, mechanic, moves, condition, min(battles, 200), seed)
+        print(f"{mechanic:<12} {battles / elapsed:>10,.0f} {turns / battles:>13.2f} {us_per_turn:>8.1f} "
+              f"{(us_per_turn / baseline_us - 1) * 100:>+7.1f}% {fired:>13.2f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,44 @@
+"""Tests for the standalone simulator's greedy damage tables."""
+import os
+import numpy as np
+import pytest
+from battle_simulator import BattleSimulator, Pokemon, STATUS_CONDITIONS
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pokemon.csv')
+
+@pytest.fixture(scope='module')
+def simulator():
+    return BattleSimulator(0, DATA_PATH, greedy_cache_size=4)
+
+def combatants(simulator, attacker_name, defender_name, status=None):
+    attacker = Pokemon(attacker_name, simulator.pokemon_store.get(attacker_name))
+    defender = Pokemon(defender_name, simulator.pokemon_store.get(defender_name))
+    if status is not None:
+        attacker.set_status(STATUS_CONDITIONS[status])
+    return attacker, defender
+
+@pytest.mark.parametrize('attacker_name, defender_name, status', [
+    ('Machamp', 'Snorlax', 'burn'), ('Charizard', 'Blastoise', None), ('Geodude', 'Charmander', 'burn')])
+def test_ko_probability_matches_calculate_damage(simulator, attacker_name, defender_name, status):
+    attacker, defender = combatants(simulator, attacker_name, defender_name, status)
+    moves = simulator.damaging_moves[:10]
+    _, ko_probability = simulator.damage_tables(attacker, defender, moves)
+    hp = np.arange(defender.max_hp + 1)
+    for row, move in enumerate(moves):
+        damage = np.array([simulator.calculate_damage(attacker, defender, move) for _ in range(20000)])
+        sampled = min(move.accuracy, 100) / 100 * (damage[:, None] >= hp).mean(axis=0)
+        assert np.abs(ko_probability[row] - sampled).max() < 0.02
+
+def test_greedy_move_takes_the_best_ko_chance(simulator):
+    attacker, defender = combatants(simulator, 'Pikachu', 'Gyarados')
+    _, ko_probability = simulator.damage_tables(attacker, defender, simulator.damaging_moves)
+    for hp in (1, defender.max_hp // 2, defender.max_hp):
+        defender.current_hp = hp
+        move = simulator.greedy_move(attacker, defender)
+        assert ko_probability[simulator.damaging_moves.index(move), hp] == ko_probability[:, hp].max()
+
+def test_greedy_tables_are_bounded(simulator):
+    for name in ('Pikachu', 'Mew', 'Onix', 'Eevee', 'Abra', 'Zubat'):
+        attacker, defender = combatants(simulator, name, 'Snorlax')
+        simulator.greedy_move(attacker, defender)
+    assert len(simulator.greedy_tables) == 4
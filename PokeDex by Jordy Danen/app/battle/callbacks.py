@@ -1,69 +1,135 @@
 """Battle tab callbacks module."""
-from dash import Input, Output, State, callback_context, html, dcc, no_update
+from functools import lru_cache
+from dash import Input, Output, State, html, dcc, no_update
 import plotly.graph_objects as go
+import numpy as np
 from app.utils.helpers import get_pokemon_image_url
-from app.data.pokemon_data import pokemon_df
-from app.battle.simulator import BattleSimulator
+from app.data.pokemon_data import get_pokemon_data, get_pokemon_store
+from app.battle.simulator import BattleSimulator, MAX_TURNS
 from app.battle.predictor import BattlePredictor
+from app.battle.policy import POLICIES, make_policy
 
-# Initialize battle simulator and predictor
-battle_simulator = BattleSimulator(pokemon_df)
-battle_predictor = BattlePredictor(pokemon_df)
+# Battle simulator, predictor and one policy of each kind, created on first
+# use so importing this module does not load the Pokemon data. The policies'
+# caches serve every prediction made in this process; background battles run
+# in forked workers and fill their own copies
+_battle_simulator = None
+_battle_predictor = None
+_battle_policies = None
+
+def get_battle_simulator():
+    """Get the battle simulator for the app's Pokemon data, creating it on first use."""
+    global _battle_simulator
+    if _battle_simulator is None:
+        _battle_simulator = BattleSimulator(get_pokemon_data())
+    return _battle_simulator
+
+def get_battle_predictor():
+    """Get the battle predictor for the app's Pokemon data, creating it on first use."""
+    global _battle_predictor
+    if _battle_predictor is None:
+        _battle_predictor = BattlePredictor(get_pokemon_data())
+    return _battle_predictor
+
+def get_battle_policy(name):
+    """Get the shared policy of a name, or None for random moves."""
+    global _battle_policies
+    if _battle_policies is None:
+        moves = get_battle_simulator().moves
+        _battle_policies = {policy: make_policy(policy, moves) for policy in POLICIES}
+    return _battle_policies.get(name)
+
+# Turns between progress updates sent to the browser
+PROGRESS_INTERVAL = 10
+
+# Battles simulated for the odds shown when an AI policy picks the moves
+PREDICTION_BATTLES = 1000
+
+@lru_cache(maxsize=256)
+def pokemon_panel(pokemon_name):
+    """Get the image URL and stats display for a Pokemon, cached by name."""
+    if not pokemon_name:
+        return '', ''
+    pokemon = get_pokemon_store().get(pokemon_name)
+    return get_pokemon_image_url(pokemon['pokedex_number']), create_stats_display(pokemon)
+
+@lru_cache(maxsize=4096)
+def prediction_text(pokemon1_name, pokemon2_name, policy_name='random'):
+    """Get the win prediction text for a matchup and move policy, cached by its arguments."""
+    if not (pokemon1_name and pokemon2_name):
+        return ''
+    policy = get_battle_policy(policy_name)
+    if policy is None:
+        # Exact odds of a random-move battle, solved rather than sampled
+        win_probability = get_battle_predictor().exact_win_probability(pokemon1_name, pokemon2_name)
+        return f"{pokemon1_name} has a {win_probability*100:.1f}% chance of winning"
+    
+    # The exact solver only models random moves, so AI battles are sampled
+    result = get_battle_simulator().simulate_many(pokemon1_name, pokemon2_name, PREDICTION_BATTLES, seed=0,
+                                                  policies=(policy, policy))
+    return (f"{pokemon1_name} has about a {result['win_probability']*100:.1f}% chance of winning "
+            f"({PREDICTION_BATTLES:,} simulated battles)")
 
 def register_callbacks(app):
     """Register all callbacks for the battle tab."""
     
+    # Each side's panel only depends on its own selection
+    for side in ('pokemon1', 'pokemon2'):
+        @app.callback(
+            [Output(f'{side}-image', 'src'),
+             Output(f'{side}-stats', 'children')],
+            [Input(f'{side}-select', 'value')],
+            prevent_initial_call=True
+        )
+        def update_pokemon_panel(pokemon_name):
+            return pokemon_panel(pokemon_name)
+    
     @app.callback(
-        [Output('pokemon1-image', 'src'),
-         Output('pokemon2-image', 'src'),
-         Output('pokemon1-stats', 'children'),
-         Output('pokemon2-stats', 'children'),
-         Output('battle-prediction', 'children'),
-         Output('battle-log', 'children')],
+        Output('battle-prediction', 'children'),
         [Input('pokemon1-select', 'value'),
          Input('pokemon2-select', 'value'),
-         Input('simulate-battle-btn', 'n_clicks')],
-        [State('battle-log', 'children')],
+         Input('battle-policy', 'value')],
         prevent_initial_call=True
     )
-    def update_battle_display(pokemon1_name, pokemon2_name, n_clicks, current_log):
-        ctx = callback_context
-        triggered_id = ctx.triggered[0]['prop_id'] if ctx.triggered else None
-        
-        # Initialize outputs
-        pokemon1_image = ''
-        pokemon2_image = ''
-        pokemon1_stats = ''
-        pokemon2_stats = ''
-        prediction_text = ''
-        battle_log = current_log or ''
-        
-        # If no Pokemon selected, return empty values
-        if not pokemon1_name and not pokemon2_name:
-            return pokemon1_image, pokemon2_image, pokemon1_stats, pokemon2_stats, prediction_text, battle_log
-        
-        # Update Pokemon 1 display if selected
-        if pokemon1_name:
-            pokemon1 = pokemon_df[pokemon_df['name'] == pokemon1_name].iloc[0]
-            pokemon1_image = get_pokemon_image_url(pokemon1['pokedex_number'])
-            pokemon1_stats = create_stats_display(pokemon1)
+    def update_prediction(pokemon1_name, pokemon2_name, policy_name):
+        return prediction_text(pokemon1_name, pokemon2_name, policy_name)
+    
+    # The battle runs in a background process, so a long battle never holds a
+    # request thread; it reports progress and can be cancelled
+    @app.callback(
+        Output('battle-log', 'children'),
+        [Input('simulate-battle-btn', 'n_clicks')],
+        [State('pokemon1-select', 'value'),
+         State('pokemon2-select', 'value'),
+         State('battle-policy', 'value')],
+        background=True,
+        running=[
+            (Output('simulate-battle-btn', 'disabled'), True, False),
+            (Output('cancel-battle-btn', 'style'), {'display': 'block'}, {'display': 'none'}),
+            (Output('battle-progress', 'style'), {'width': '100%'}, {'display': 'none'})
+        ],
+        cancel=[Input('cancel-battle-btn', 'n_clicks')],
+        progress=[Output('battle-progress', 'value'),
+                  Output('battle-progress', 'max')],
+        prevent_initial_call=True
+    )
+    def run_battle(set_progress, n_clicks, pokemon1_name, pokemon2_name, policy_name):
+        if not (n_clicks and pokemon1_name and pokemon2_name):
+            return no_update
         
-        # Update Pokemon 2 display if selected
-        if pokemon2_name:
-            pokemon2 = pokemon_df[pokemon_df['name'] == pokemon2_name].iloc[0]
-            pokemon2_image = get_pokemon_image_url(pokemon2['pokedex_number'])
-            pokemon2_stats = create_stats_display(pokemon2)
+        def report(turn):
+            if turn % PROGRESS_INTERVAL == 0:
+                set_progress((str(turn), str(MAX_TURNS)))
         
-        # Update prediction only if both Pokemon are selected
-        if pokemon1_name and pokemon2_name:
-            win_probability = battle_predictor.predict_battle(pokemon1_name, pokemon2_name)
-            prediction_text = f"{pokemon1_name} has a {win_probability*100:.1f}% chance of winning"
-            
-            # If battle button was clicked, simulate battle
-            if triggered_id == 'simulate-battle-btn.n_clicks' and n_clicks:
-                battle_log = '\n'.join(battle_simulator.simulate_battle(pokemon1_name, pokemon2_name))
+        # Both sides pick their moves the same way
+        policy = get_battle_policy(policy_name)
         
-        return pokemon1_image, pokemon2_image, pokemon1_stats, pokemon2_stats, prediction_text, battle_log
+        # Jobs run in forked processes that would all inherit the same generator
+        # state, so every battle gets a fresh seed
+        return '\n'.join(get_battle_simulator().simulate_battle(pokemon1_name, pokemon2_name,
+                                                                max_turns=MAX_TURNS, progress=report,
+                                                                seed=np.random.SeedSequence(),
+                                                                policies=(policy, policy)))
 
 def create_stats_display(pokemon):
     """Create a stats display for a Pokemon."""
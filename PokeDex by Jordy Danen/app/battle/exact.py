@@ -0,0 +1,99 @@
+"""Exact win probabilities for the 1v1 battle model of BattleSimulator.
+
+The faster Pokemon attacks first every turn, and each attack is a random
+move of a random one of the attacker's types, which may miss, with a
+uniform 0.85-1.0 damage roll. So a battle is a Markov chain over the two
+Pokemon's HP, and the chance of winning from every pair of HP follows from a
+dynamic program, with no Monte Carlo. Damage distributions come from the
+MatchupTables of app.battle.policy, and both they and the results are cached.
+"""
+import numpy as np
+from app.battle.policy import MatchupTable
+from app.battle.simulator import Pokemon
+from app.data.move_data import MoveTable, get_move_table
+from app.data.pokemon_data import PokemonStore, get_pokemon_store
+from app.utils.result_cache import ResultCache
+
+def first_mover_wins(first_pmf: np.ndarray, second_pmf: np.ndarray) -> float:
+    """Get the chance that the Pokemon moving first wins, from full HP.
+
+    first_pmf[k] is the chance that one attack of the first Pokemon deals k
+    damage, with anything from the second Pokemon's HP up counted as its HP,
+    so len(first_pmf) is that HP plus one; second_pmf is the same for the
+    second Pokemon's attacks.
+    """
+    first_hp, second_hp = len(second_pmf) - 1, len(first_pmf) - 1
+
+    # ko[s - 1]: the first attack knocks out a second Pokemon with s HP
+    ko = np.cumsum(first_pmf[::-1])[::-1][1:]
+
+    # After the first attack and a reply of j damage, the first Pokemon wins
+    # with sum_k first_pmf[k] * wins[f - j, s - k]. Write the first attack as
+    # the lower triangular Toeplitz matrix hit, so for every row f of wins:
+    #   wins[f] = ko + hit @ (second_pmf[0] * wins[f] + after_reply[f])
+    # where after_reply[f] sums the replies that deal damage. Solving for
+    # wins[f] once up front leaves two matrix-vector products per row.
+    offsets = np.subtract.outer(np.arange(second_hp), np.arange(second_hp))
+    hit = np.where(offsets >= 0, first_pmf[np.maximum(offsets, 0)], 0.0)
+    solved = np.linalg.solve(np.eye(second_hp) - second_pmf[0] * hit, np.column_stack([ko, hit]))
+    base, spread = solved[:, 0], solved[:, 1:]
+
+    # wins[f, s - 1]: the first Pokemon wins from f and s HP, with row 0 lost
+    wins = np.zeros((first_hp + 1, second_hp))
+    for f in range(1, first_hp + 1):
+        after_reply = second_pmf[1:f] @ wins[f - 1:0:-1]
+        wins[f] = base + spread @ after_reply
+    return float(wins[first_hp, second_hp - 1])
+
+class ExactSolver:
+    """Exact win probabilities for pairs of Pokemon in a PokemonStore.
+
+    The MatchupTable of each (attacker, defender), i.e. the damage
+    distribution of every move, and each pair's result are kept in LRU
+    caches of cache_size entries.
+
+    Battles are solved as running until a knockout: the simulator's draw
+    after MAX_TURNS turns is ignored. Every hit deals at least 1 damage, so
+    the cap is only reached when both sides barely hurt each other, e.g.
+    both immune to each other's moves; the odds then differ from the
+    simulator's by the chance of a draw.
+    """
+
+    def __init__(self, store: PokemonStore, moves: MoveTable = None, cache_size: int = 4096):
+        self.store = store
+        self.moves = moves if moves is not None else get_move_table()
+        self.tables = ResultCache(cache_size)
+        self.results = ResultCache(cache_size)
+
+    def attack_distribution(self, attacker: Pokemon, defender: Pokemon) -> np.ndarray:
+        """Get the damage distribution of one random attack, clipped to the defender's HP."""
+        table = self.tables.get_or_compute((attacker.name, defender.name),
+                                           lambda: MatchupTable(attacker, defender, self.moves))
+        return table.random_weights @ table.damage_pmf
+
+    def win_probability(self, pokemon1_name: str, pokemon2_name: str) -> float:
+        """Get the exact chance that pokemon1 beats pokemon2."""
+        return self.results.get_or_compute((pokemon1_name, pokemon2_name),
+                                           lambda: self._win_probability(pokemon1_name, pokemon2_name))
+
+    def _win_probability(self, pokemon1_name: str, pokemon2_name: str) -> float:
+        """Compute win_probability without the result cache."""
+        pokemon1 = Pokemon(self.store.get(pokemon1_name))
+        pokemon2 = Pokemon(self.store.get(pokemon2_name))
+
+        # pokemon1 moves first on a speed tie, as in the simulator
+        if pokemon1.speed >= pokemon2.speed:
+            return first_mover_wins(self.attack_distribution(pokemon1, pokemon2),
+                                    self.attack_distribution(pokemon2, pokemon1))
+        return 1.0 - first_mover_wins(self.attack_distribution(pokemon2, pokemon1),
+                                      self.attack_distribution(pokemon1, pokemon2))
+
+# Created on first use, for the app's Pokemon data and move table
+_solver = None
+
+def exact_win_probability(pokemon1_name: str, pokemon2_name: str) -> float:
+    """Get the exact chance that pokemon1 beats pokemon2 in the app's battle model."""
+    global _solver
+    if _solver is None:
+        _solver = ExactSolver(get_pokemon_store())
+    return _solver.win_probability(pokemon1_name, pokemon2_name)
@@ -1,9 +1,11 @@
 """Battle tab layout module."""
 from dash import html, dcc
-from app.data.pokemon_data import pokemon_df
+from app.data.pokemon_data import get_pokemon_data
 
 def create_layout():
     """Create the layout for the battle tab."""
+    pokemon_names = sorted(get_pokemon_data()['name'].unique())
+    
     return html.Div([
         # Pokemon Selection Row
         html.Div([
@@ -13,7 +15,7 @@ def create_layout():
                 dcc.Dropdown(
                     id='pokemon1-select',
                     options=[{'label': name, 'value': name} 
-                            for name in sorted(pokemon_df['name'].unique())],
+                            for name in pokemon_names],
                     placeholder='Select a Pokemon'
                 )
             ], style={'width': '45%', 'display': 'inline-block'}),
@@ -29,7 +31,7 @@ def create_layout():
                 dcc.Dropdown(
                     id='pokemon2-select',
                     options=[{'label': name, 'value': name}
-                            for name in sorted(pokemon_df['name'].unique())],
+                            for name in pokemon_names],
                     placeholder='Select a Pokemon'
                 )
             ], style={'width': '45%', 'display': 'inline-block'})
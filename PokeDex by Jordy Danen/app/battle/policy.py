@@ -0,0 +1,187 @@
+"""Move selection policies for the battle simulator.
+
+By default an attacker in BattleSimulator picks a random move of one of its
+types. A policy picks the move instead. For every matchup it builds a
+MatchupTable once: the exact damage distribution of each of the attacker's
+damaging moves, plus expected damage and KO probability against every HP
+the defender can have. After that, a turn's choice is an array lookup
+(greedy) or a small expectimax search over the table (expectimax).
+
+A policy must use the same move table as the simulator it is given to.
+"""
+import numpy as np
+from app.battle.simulator import Pokemon, base_damage
+from app.data.move_data import PHYSICAL, MoveTable, get_move_table
+from app.utils.type_index import effectiveness
+from app.utils.result_cache import ResultCache
+
+def damage_distribution(base: float) -> tuple:
+    """Get the (damage values, probabilities) of max(1, int(base * roll)).
+
+    The roll is uniform on [0.85, 1.0], as in the simulator, so each damage
+    value's probability is the length of the roll interval that floors to it.
+    """
+    low, high = 0.85 * base, float(base)
+    if high <= low:
+        # No damage before the minimum of 1, e.g. against an immune type
+        return np.ones(1, dtype=np.int64), np.ones(1)
+    values = np.arange(int(low), int(high) + 1)
+    probabilities = (np.minimum(values + 1, high) - np.maximum(values, low)) / (high - low)
+    keep = probabilities > 0
+    return np.maximum(1, values[keep]), probabilities[keep]
+
+class MatchupTable:
+    """Damage tables of one attacker's moves against one defender.
+
+    Rows are the damaging moves of the attacker's types, in move_ids, and
+    random_weights is the chance that the simulator's random choice (a
+    random type of the attacker, then a random move of it) picks each row.
+    damage_pmf[m, k] is the chance that move m deals k damage, with misses
+    counted as 0 and anything from defender_hp up counted as defender_hp.
+    ko_probability[m, h] is the chance that move m knocks out a defender
+    with h HP left, and greedy_moves[h] the row with the best KO chance
+    at h HP, ties broken by expected damage.
+    """
+
+    def __init__(self, attacker: Pokemon, defender: Pokemon, moves: MoveTable):
+        self.matchup = (attacker.name, defender.name)
+        slots = [moves.damaging_by_type[code] for code in attacker.type_codes]
+        self.move_ids = np.concatenate(slots)
+        self.random_weights = np.concatenate([np.full(len(slot), 1 / (len(slots) * len(slot))) for slot in slots])
+        self.defender_hp = defender.hp
+
+        physical = moves.categories[self.move_ids] == PHYSICAL
+        attack = np.where(physical, attacker.attack, attacker.sp_attack)
+        defense = np.where(physical, defender.defense, defender.sp_defense)
+        type_multiplier = effectiveness(moves.types[self.move_ids], *defender.type_codes)
+        self.base = base_damage(moves.power[self.move_ids], attack, defense) * type_multiplier
+        self.accuracy = moves.accuracy[self.move_ids]
+        hit_chance = np.minimum(self.accuracy, 100) / 100
+
+        self.damage_pmf = np.zeros((len(self.move_ids), self.defender_hp + 1))
+        self.expected_damage = np.zeros(len(self.move_ids))
+        for row, base in enumerate(self.base):
+            values, probabilities = damage_distribution(base)
+            self.damage_pmf[row] = np.bincount(np.minimum(values, self.defender_hp),
+                                               probabilities * hit_chance[row], self.defender_hp + 1)
+            self.expected_damage[row] = hit_chance[row] * values @ probabilities
+        self.damage_pmf[:, 0] += 1 - hit_chance
+
+        # P(damage >= h) for every h, as a reversed cumulative sum
+        self.ko_probability = np.cumsum(self.damage_pmf[:, ::-1], axis=1)[:, ::-1]
+        expected = np.broadcast_to(self.expected_damage[:, None], self.ko_probability.shape)
+        self.greedy_moves = np.lexsort((expected, self.ko_probability), axis=0)[-1]
+
+    def roll(self, choices: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+        """Resolve the chosen rows from an (ATTACK_ROLLS, size) roll array, like DamageTables.roll."""
+        random_factor = 0.85 + 0.15 * rolls[3]
+        damage = np.maximum(1, (self.base[choices] * random_factor).astype(np.int64))  # Minimum 1 damage
+        return np.where(rolls[0] * 100 < self.accuracy[choices], damage, 0)
+
+class MovePolicy:
+    """Base class of the policies; builds and caches a MatchupTable per matchup.
+
+    The tables of the cache_size most recently used matchups are kept, so a
+    long-lived policy does not grow with every matchup it has seen.
+    Subclasses implement choose, which gets the attacker's table, the
+    defender's table against the attacker and both Pokemon's HP, and returns
+    a row of the attacker's table.
+    """
+
+    def __init__(self, moves: MoveTable = None, cache_size: int = 256):
+        self.moves = moves if moves is not None else get_move_table()
+        self._tables = ResultCache(cache_size)
+
+    def table(self, attacker: Pokemon, defender: Pokemon) -> MatchupTable:
+        """Get the MatchupTable of an attacker against a defender, building it once."""
+        return self._tables.get_or_compute((attacker.name, defender.name),
+                                           lambda: MatchupTable(attacker, defender, self.moves))
+
+    def choose(self, table: MatchupTable, reply: MatchupTable, attacker_hp: int, defender_hp: int) -> int:
+        raise NotImplementedError
+
+    def choose_many(self, table: MatchupTable, reply: MatchupTable, attacker_hp: np.ndarray,
+                    defender_hp: np.ndarray) -> np.ndarray:
+        """Choose rows for a batch of battles, once per distinct pair of HP."""
+        pairs, inverse = np.unique(np.stack([attacker_hp, defender_hp]), axis=1, return_inverse=True)
+        choices = np.array([self.choose(table, reply, int(a), int(d)) for a, d in pairs.T], dtype=np.intp)
+        return choices[inverse.ravel()]
+
+    def choose_move(self, attacker: Pokemon, defender: Pokemon) -> int:
+        """Get the move number, in the move table, that attacker uses against defender."""
+        table = self.table(attacker, defender)
+        row = self.choose(table, self.table(defender, attacker), attacker.current_hp, defender.current_hp)
+        return int(table.move_ids[row])
+
+class GreedyPolicy(MovePolicy):
+    """Use the move most likely to knock the defender out this turn, else the hardest hitting one."""
+
+    def choose(self, table, reply, attacker_hp, defender_hp):
+        return int(table.greedy_moves[defender_hp])
+
+    def choose_many(self, table, reply, attacker_hp, defender_hp):
+        return table.greedy_moves[defender_hp]
+
+class ExpectimaxPolicy(MovePolicy):
+    """Depth-limited expectimax over the matchup's damage distributions.
+
+    Looks depth turns ahead, a turn being the attacker's move and the
+    defender's reply. The defender is assumed to play greedily. A knockout
+    is worth 1 to the winner and 0 to the loser; positions at the depth
+    limit are scored from both sides' HP fractions. Position values are
+    memoized in an LRU cache of value_cache_size entries, so later turns of
+    a battle in the same process mostly reuse the earlier turns' search.
+    """
+
+    def __init__(self, moves: MoveTable = None, depth: int = 2, cache_size: int = 256,
+                 value_cache_size: int = 1 << 16):
+        super().__init__(moves, cache_size)
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        self._values = ResultCache(value_cache_size)
+
+    def choose(self, table, reply, attacker_hp, defender_hp):
+        return int(np.argmax(self.move_values(table, reply, attacker_hp, defender_hp, self.depth)))
+
+    def move_values(self, table: MatchupTable, reply: MatchupTable, attacker_hp: int, defender_hp: int,
+                    depth: int) -> np.ndarray:
+        """Get the expected value of every row of the attacker's table."""
+        # Damage that leaves the defender standing, with the defender's HP after it
+        damage = np.flatnonzero(table.damage_pmf[:, :defender_hp].any(axis=0))
+        after_reply = self._reply_value(table, reply, attacker_hp, defender_hp - damage, depth)
+        return table.ko_probability[:, defender_hp] + table.damage_pmf[:, damage] @ after_reply
+
+    def _value(self, table, reply, attacker_hp, defender_hp, depth) -> float:
+        """Get the value of a position with the attacker to move, memoized."""
+        return self._values.get_or_compute(
+            table.matchup + (attacker_hp, defender_hp, depth),
+            lambda: float(self.move_values(table, reply, attacker_hp, defender_hp, depth).max()))
+
+    def _reply_value(self, table, reply, attacker_hp, defender_hps, depth) -> np.ndarray:
+        """Get the value to the attacker, for each defender HP, after the defender's greedy reply."""
+        row = reply.greedy_moves[attacker_hp]
+        damage = np.flatnonzero(reply.damage_pmf[row, :attacker_hp])
+        attacker_hps = attacker_hp - damage
+        if depth == 1:
+            values = 0.5 + 0.5 * (attacker_hps[:, None] / reply.defender_hp - defender_hps[None, :] / table.defender_hp)
+        else:
+            values = np.zeros((len(attacker_hps), len(defender_hps)))
+            for i, a in enumerate(attacker_hps):
+                for j, d in enumerate(defender_hps):
+                    values[i, j] = self._value(table, reply, int(a), int(d), depth - 1)
+        return reply.damage_pmf[row, damage] @ values
+
+# Policies by the name used in the UI; 'random' is the simulator's own choice
+POLICIES = {
+    'random': None,
+    'greedy': GreedyPolicy,
+    'expectimax': ExpectimaxPolicy
+}
+
+def make_policy(name: str, moves: MoveTable = None):
+    """Create a policy by name, or get None for random moves."""
+    if name not in POLICIES:
+        raise ValueError(f"Unknown move policy: {name}")
+    policy = POLICIES[name]
+    return policy(moves) if policy is not None else None
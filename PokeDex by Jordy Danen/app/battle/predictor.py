@@ -10,6 +10,10 @@ import ast
 import pickle
 import warnings
 import os
+from app.utils.type_index import dual_effectiveness
+from app.data.pokemon_data import PokemonRecord, PokemonStore
+from app.utils.result_cache import ResultCache, array_version, dataframe_version
+from app.battle.exact import ExactSolver
 
 warnings.filterwarnings('ignore')
 
@@ -49,6 +53,7 @@ class PokemonTypeTransformer:
     def __init__(self, pokemon_df: pd.DataFrame):
         """Initialize transformer with Pokemon data."""
         self.pokemon_df = pokemon_df
+        self.store = PokemonStore(pokemon_df)
         self.type_mapping = None
         self._fit_type_mapping()
         
@@ -69,17 +74,10 @@ class PokemonTypeTransformer:
         
     def transform_pokemon(self, pokemon_name: str) -> np.ndarray:
         """Transform Pokemon data into feature vector."""
-        pokemon = self.pokemon_df[self.pokemon_df['name'] == pokemon_name].iloc[0]
+        pokemon = self.store.get(pokemon_name)
         
         # Get stats
-        stats = np.array([
-            pokemon['hp'],
-            pokemon['attack'],
-            pokemon['defense'],
-            pokemon['sp_attack'],
-            pokemon['sp_defense'],
-            pokemon['speed']
-        ]) / 255.0  # Normalize stats
+        stats = pokemon.stats / 255.0  # Normalize stats
         
         # Get type encoding
         type_encoding = self._encode_types(pokemon['type1'], pokemon['type2'])
@@ -271,20 +269,39 @@ def main():
 class BattlePredictor:
     """Neural network for predicting battle outcomes."""
     
-    def __init__(self, pokemon_df: pd.DataFrame):
-        """Initialize predictor with Pokemon data."""
+    def __init__(self, pokemon_df: pd.DataFrame, cache_size: int = 4096, cache_path: str = None):
+        """Initialize predictor with Pokemon data.
+        
+        Results of predict_battle are kept in an LRU cache of cache_size
+        entries, and also in a SQLite file at cache_path if given. The cache is
+        versioned by the Pokemon data, which is all this heuristic depends on.
+        Exact odds under the battle simulator's rules come from exact_win_probability.
+        """
         self.pokemon_df = pokemon_df
         self.transformer = PokemonTypeTransformer(pokemon_df)
+        self.store = self.transformer.store
+        self._win_matrix = None
+        self.cache = ResultCache(cache_size, cache_path, version=f"heuristic-{dataframe_version(pokemon_df)}")
+        self.exact = ExactSolver(self.store, cache_size=cache_size)
         
     def predict_battle(self, pokemon1_name: str, pokemon2_name: str) -> float:
         """Predict probability of pokemon1 winning against pokemon2."""
+        return self.cache.get_or_compute((pokemon1_name, pokemon2_name, None),
+                                         lambda: self._predict_battle(pokemon1_name, pokemon2_name))
+        
+    def exact_win_probability(self, pokemon1_name: str, pokemon2_name: str) -> float:
+        """Get the exact probability of pokemon1 winning a BattleSimulator battle against pokemon2."""
+        return self.exact.win_probability(pokemon1_name, pokemon2_name)
+        
+    def _predict_battle(self, pokemon1_name: str, pokemon2_name: str) -> float:
+        """Compute predict_battle without the cache."""
         # Get Pokemon data
-        pokemon1 = self.pokemon_df[self.pokemon_df['name'] == pokemon1_name].iloc[0]
-        pokemon2 = self.pokemon_df[self.pokemon_df['name'] == pokemon2_name].iloc[0]
+        pokemon1 = self.store.get(pokemon1_name)
+        pokemon2 = self.store.get(pokemon2_name)
         
         # Calculate base stats total
-        bst1 = pokemon1[['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']].sum()
-        bst2 = pokemon2[['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']].sum()
+        bst1 = int(pokemon1.stats.sum())
+        bst2 = int(pokemon2.stats.sum())
         
         # Calculate type effectiveness
         type_effectiveness1 = self._calculate_type_effectiveness(pokemon1, pokemon2)
@@ -294,30 +311,91 @@ class BattlePredictor:
         score1 = bst1 * type_effectiveness1
         score2 = bst2 * type_effectiveness2
         
+        # Neither side can damage the other (e.g. Normal vs Ghost)
+        if score1 + score2 == 0:
+            return 0.5
+        
         win_probability = score1 / (score1 + score2)
         return win_probability
         
-    def _calculate_type_effectiveness(self, attacker: pd.Series, defender: pd.Series) -> float:
+    def predict_matrix(self, names_a: list = None, names_b: list = None,
+                       cache_dir: str = None) -> np.ndarray:
+        """Predict win probabilities for every pair of Pokemon in one pass.
+        
+        Entry [i, j] is the probability that names_a[i] beats names_b[j], using
+        the same BST-times-type-effectiveness score as predict_battle. Either
+        list defaults to the full roster. With cache_dir set, the full roster
+        matrix is saved there keyed by a hash of this predictor's roster and reused.
+        """
+        if names_a is None and names_b is None:
+            return self._full_matrix(cache_dir)
+        
+        rows = self._positions(names_a)
+        cols = self._positions(names_b)
+        if cache_dir is not None or self._win_matrix is not None:
+            return self._full_matrix(cache_dir)[np.ix_(rows, cols)]
+        return self._score_matrix(rows, cols)
+        
+    def find_counters(self, pokemon_name: str, top_n: int = 5) -> list:
+        """Get the Pokemon most likely to beat the given Pokemon."""
+        target = self.store.index_of(pokemon_name)
+        win_probabilities = self._full_matrix()[:, target]
+        ranked = [i for i in np.argsort(-win_probabilities, kind='stable') if i != target]
+        return [(self.store.names[i], float(win_probabilities[i])) for i in ranked[:top_n]]
+        
+    def _positions(self, names: list) -> np.ndarray:
+        """Convert Pokemon names to store positions; None means everyone."""
+        if names is None:
+            return np.arange(len(self.store))
+        return np.array([self.store.index_of(name) for name in names], dtype=np.intp)
+        
+    def _full_matrix(self, cache_dir: str = None) -> np.ndarray:
+        """Get the all-vs-all matrix, computing or loading it at most once."""
+        if self._win_matrix is not None:
+            return self._win_matrix
+        
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(cache_dir, f'win_matrix_{self._roster_version()}.npy')
+            if os.path.exists(cache_path):
+                self._win_matrix = np.load(cache_path)
+                return self._win_matrix
+        
+        everyone = np.arange(len(self.store))
+        self._win_matrix = self._score_matrix(everyone, everyone)
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(cache_path, self._win_matrix)
+        return self._win_matrix
+        
+    def _roster_version(self) -> str:
+        """Get a hash of everything the win matrix depends on: names, stats and types, in store order."""
+        store = self.store
+        return array_version(np.array(store.names), store.stats, store.type1, store.type2)
+        
+    def _score_matrix(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Vectorized predict_battle for every (rows[i], cols[j]) pair."""
+        store = self.store
+        bst = store.stats.sum(axis=1, dtype=np.float64)
+        
+        # Type codes shaped for broadcasting to (len(rows), len(cols))
+        a1, a2 = store.type1[rows, None], store.type2[rows, None]
+        b1, b2 = store.type1[None, cols], store.type2[None, cols]
+        
+        score1 = bst[rows, None] * dual_effectiveness(a1, a2, b1, b2)
+        score2 = bst[None, cols] * dual_effectiveness(b1, b2, a1, a2)
+        total = score1 + score2
+        
+        # Pairs where neither side can do damage are a coin flip
+        win_probability = np.divide(score1, total, out=np.full_like(total, 0.5), where=total > 0)
+        return win_probability.astype(np.float32)
+        
+    def _calculate_type_effectiveness(self, attacker: PokemonRecord, defender: PokemonRecord) -> float:
         """Calculate type effectiveness multiplier."""
-        from app.utils.constants import TYPE_EFFECTIVENESS
-        
-        effectiveness = 1.0
-        
-        # Check attacker's type1 effectiveness
-        if attacker['type1'].lower() in TYPE_EFFECTIVENESS:
-            if defender['type1'].lower() in TYPE_EFFECTIVENESS[attacker['type1'].lower()]:
-                effectiveness *= TYPE_EFFECTIVENESS[attacker['type1'].lower()][defender['type1'].lower()]
-            if pd.notna(defender['type2']) and defender['type2'].lower() in TYPE_EFFECTIVENESS[attacker['type1'].lower()]:
-                effectiveness *= TYPE_EFFECTIVENESS[attacker['type1'].lower()][defender['type2'].lower()]
-        
-        # Check attacker's type2 effectiveness if it exists
-        if pd.notna(attacker['type2']) and attacker['type2'].lower() in TYPE_EFFECTIVENESS:
-            if defender['type1'].lower() in TYPE_EFFECTIVENESS[attacker['type2'].lower()]:
-                effectiveness *= TYPE_EFFECTIVENESS[attacker['type2'].lower()][defender['type1'].lower()]
-            if pd.notna(defender['type2']) and defender['type2'].lower() in TYPE_EFFECTIVENESS[attacker['type2'].lower()]:
-                effectiveness *= TYPE_EFFECTIVENESS[attacker['type2'].lower()][defender['type2'].lower()]
-        
-        return effectiveness
+        return float(dual_effectiveness(
+            attacker.type1_code, attacker.type2_code,
+            defender.type1_code, defender.type2_code
+        ))
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,56 @@
-"""Battle simulator module."""
-import random
+"""Battle simulator module.
+
+All randomness comes from a numpy Generator (see app.utils.rng), so a
+battle is reproducible from its seed. Each attack is driven by one row of
+ATTACK_ROLLS uniform numbers, and those are drawn for a whole block of turns
+or a whole batch of battles at once.
+
+Each battle keeps its state in a Battle created for that call. iter_battle
+yields structured BattleEvents as the battle is played, simulate_battle
+renders them as log lines and battle_winner skips the log altogether.
+
+Moves come from the move table (app.data.move_data): an attacker picks one
+of its types, then a damaging move of that type, which may miss. Either side
+can be given a move policy (app.battle.policy) to choose its moves instead.
+"""
+from typing import NamedTuple
+import numpy as np
 import pandas as pd
-from app.utils.constants import TYPE_EFFECTIVENESS, TYPE_MOVES
+from app.utils.type_index import NO_TYPE, TYPE_MATRIX, type_code, effectiveness as type_effectiveness
+from app.utils.rng import make_rng
+from app.data.pokemon_data import STAT_INDEX, PokemonRecord, PokemonStore
+from app.data.move_data import PHYSICAL, MoveTable, get_move_table
+
+# Hard cap on the number of turns in a single logged battle
+MAX_TURNS = 500
+
+# Uniform numbers per attack: accuracy, move type, move, damage roll
+ATTACK_ROLLS = 4
+
+# Turns of rolls drawn at once by simulate_battle
+TURN_BLOCK = 32
+
+def base_damage(move_power: int, attacker_stat: int, defender_stat: int) -> float:
+    """Calculate damage before type effectiveness and the random factor."""
+    # Basic damage formula based on Pokemon games
+    return ((2 * 50 / 5 + 2) * move_power * attacker_stat / defender_stat) / 50 + 2
 
 class Pokemon:
-    """Class representing a Pokemon in battle."""
+    """Class representing a Pokemon in battle.
     
-    def __init__(self, data: pd.Series):
-        """Initialize Pokemon with data from DataFrame row."""
+    Stats are plain ints and types are kept both as names and as
+    app.utils.type_index codes, so an attack needs no conversions.
+    """
+    __slots__ = ('name', 'types', 'type_codes', 'hp', 'current_hp', 'attack', 'defense',
+                 'sp_attack', 'sp_defense', 'speed')
+    
+    def __init__(self, data: PokemonRecord):
+        """Initialize Pokemon with data from a PokemonStore record."""
         self.name = data['name']
         self.types = [data['type1']]
         if pd.notna(data['type2']):
             self.types.append(data['type2'])
+        self.type_codes = tuple(type_code(t) for t in self.types)
         self.hp = data['hp']
         self.current_hp = data['hp']
         self.attack = data['attack']
@@ -25,112 +64,343 @@ class Pokemon:
         return self.current_hp <= 0
         
     def calculate_damage(self, move_power: int, attacker_stat: int, 
-                        defender_stat: int, type_effectiveness: float) -> int:
-        """Calculate damage for an attack."""
-        # Basic damage formula based on Pokemon games
-        base_damage = ((2 * 50 / 5 + 2) * move_power * attacker_stat / defender_stat) / 50 + 2
-        # Apply random factor (85-100%)
-        random_factor = random.uniform(0.85, 1.0)
+                        defender_stat: int, type_effectiveness: float,
+                        random_factor: float) -> int:
+        """Calculate damage for an attack with a random factor of 0.85-1.0."""
         # Apply type effectiveness
-        final_damage = int(base_damage * type_effectiveness * random_factor)
+        final_damage = int(base_damage(move_power, attacker_stat, defender_stat) * type_effectiveness * random_factor)
         return max(1, final_damage)  # Minimum 1 damage
 
-class BattleSimulator:
-    """Class for simulating Pokemon battles."""
+class DamageTables:
+    """Damage of every move each attacker can pick, for the batch engines.
+
+    Built from PokemonStore arrays for arrays of attacker/defender
+    positions. damage (before the random factor, type effectiveness applied)
+    and accuracy are (pairs, type slot, move) arrays over the damaging moves
+    of each attacker type; the padding past move_counts is never picked.
+    """
+
+    def __init__(self, stats, type1, type2, attackers, defenders, moves: MoveTable):
+        type_slots = np.stack([type1[attackers], type2[attackers]], axis=1)
+        self.type_counts = np.where(type2[attackers] == NO_TYPE, 1, 2)
+        self.move_counts = moves.type_move_counts[type_slots]
+        move_ids = np.maximum(moves.type_moves[type_slots], 0)
+
+        physical = moves.categories[move_ids] == PHYSICAL
+        attacker_stats = stats[attackers][:, None, None, :]
+        defender_stats = stats[defenders][:, None, None, :]
+        attack = np.where(physical, attacker_stats[..., STAT_INDEX['attack']],
+                          attacker_stats[..., STAT_INDEX['sp_attack']])
+        defense = np.where(physical, defender_stats[..., STAT_INDEX['defense']],
+                           defender_stats[..., STAT_INDEX['sp_defense']])
+        move_types = moves.types[move_ids]
+        effectiveness = (TYPE_MATRIX[move_types, type1[defenders][:, None, None]] *
+                         TYPE_MATRIX[move_types, type2[defenders][:, None, None]])
+        self.damage = base_damage(moves.power[move_ids], attack, defense) * effectiveness
+        self.accuracy = moves.accuracy[move_ids]
+
+    def roll(self, rows: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+        """Resolve one attack per entry of rows from an (ATTACK_ROLLS, size) roll array."""
+        slot = (rolls[1] * self.type_counts[rows]).astype(np.intp)
+        move = (rolls[2] * self.move_counts[rows, slot]).astype(np.intp)
+        random_factor = 0.85 + 0.15 * rolls[3]
+        damage = np.maximum(1, (self.damage[rows, slot, move] * random_factor).astype(np.int64))  # Minimum 1 damage
+        return np.where(rolls[0] * 100 < self.accuracy[rows, slot, move], damage, 0)
+
+class BattleEvent(NamedTuple):
+    """Something that happened in a battle, as yielded by BattleSimulator.iter_battle.
+
+    kind is 'start', 'attack', 'draw' or 'win'. An attack names the attacker,
+    defender, move, damage dealt, type effectiveness, the defender's HP
+    left afterwards (zero or below when it fainted) and whether it missed.
+    A win names the winner as attacker.
+    """
+    kind: str
+    turn: int
+    attacker: str = None
+    defender: str = None
+    move: str = None
+    damage: int = 0
+    effectiveness: float = 1.0
+    hp_remaining: int = 0
+    missed: bool = False
+
+def format_event(event: BattleEvent) -> list:
+    """Render a battle event as battle log lines."""
+    if event.kind == 'start':
+        return [f"Battle between {event.attacker} and {event.defender} begins!"]
+    if event.kind == 'draw':
+        return [f"\nThe battle ends in a draw after {event.turn} turns!"]
+    if event.kind == 'win':
+        return [f"\n{event.attacker} wins the battle!"]
     
-    def __init__(self, pokemon_df: pd.DataFrame):
-        """Initialize battle simulator with Pokemon data."""
-        self.pokemon_df = pokemon_df
-        self.battle_log = []
+    lines = [f"{event.attacker} used {event.move}!"]
+    if event.missed:
+        lines.append(f"{event.attacker}'s attack missed!")
+        return lines
+    if event.effectiveness > 1:
+        lines.append("It's super effective!")
+    elif event.effectiveness < 1:
+        lines.append("It's not very effective...")
+    lines.append(f"{event.defender} took {event.damage} damage!")
+    if event.hp_remaining <= 0:
+        lines.append(f"{event.defender} fainted!")
+    else:
+        lines.append(f"{event.defender} has {event.hp_remaining} HP remaining!")
+    return lines
+
+class Battle:
+    """State of a single battle between two Pokemon.
+    
+    A Battle is created for every call, so one BattleSimulator can serve
+    concurrent requests. After it has been played, winner holds the winning
+    Pokemon (None for a draw) and turns the number of turns fought.
+    """
+    
+    def __init__(self, simulator: 'BattleSimulator', pokemon1: Pokemon, pokemon2: Pokemon,
+                 rng: np.random.Generator, max_turns: int = MAX_TURNS, policies=(None, None)):
+        self.simulator = simulator
+        self.pokemon1 = pokemon1
+        self.pokemon2 = pokemon2
+        self.rng = rng
+        self.max_turns = max_turns
+        self.policies = {pokemon1: policies[0], pokemon2: policies[1]}
+        self.winner = None
+        self.turns = 0
         
-    def log(self, message: str):
-        """Add message to battle log."""
-        self.battle_log.append(message)
+    def attack(self, attacker: Pokemon, defender: Pokemon, rolls) -> tuple:
+        """Resolve one attack from its ATTACK_ROLLS uniform numbers.
         
-    def get_type_effectiveness(self, move_type: str, defender_types: list) -> float:
-        """Calculate type effectiveness multiplier."""
-        effectiveness = 1.0
-        for def_type in defender_types:
-            if def_type and pd.notna(def_type):
-                if move_type.lower() in TYPE_EFFECTIVENESS and def_type.lower() in TYPE_EFFECTIVENESS[move_type.lower()]:
-                    effectiveness *= TYPE_EFFECTIVENESS[move_type.lower()][def_type.lower()]
-        return effectiveness
-        
-    def simulate_turn(self, attacker: Pokemon, defender: Pokemon) -> None:
-        """Simulate one turn of battle."""
-        # For simplicity, use a basic move with power based on attack stat
-        move_power = 80
-        is_special = random.choice([True, False])
-        
-        # Choose attack type randomly from attacker's types
-        move_type = random.choice(attacker.types)
-        
-        # Get a random move of the chosen type
-        if move_type.lower() in TYPE_MOVES:
-            move_name = random.choice(TYPE_MOVES[move_type.lower()])
-        else:
-            move_name = "Attack"
+        Returns (move name, type effectiveness, damage dealt), with None
+        as the damage of a move that missed.
+        """
+        accuracy_roll, type_roll, move_roll, damage_roll = rolls
+        moves = self.simulator.moves
+        policy = self.policies[attacker]
         
-        # Calculate stats to use
-        atk_stat = attacker.sp_attack if is_special else attacker.attack
-        def_stat = defender.sp_defense if is_special else defender.defense
+        if policy is not None:
+            move = policy.choose_move(attacker, defender)
+        else:
+            # Choose attack type randomly from attacker's types, then a move of that type
+            slot = int(type_roll * len(attacker.type_codes))
+            move = moves.pick_damaging(attacker.type_codes[slot], move_roll)
+        move_name = moves.names[move]
         
         # Calculate type effectiveness
-        effectiveness = self.get_type_effectiveness(move_type, defender.types)
+        effectiveness = float(type_effectiveness(int(moves.types[move]), *defender.type_codes))
+        if accuracy_roll * 100 >= moves.accuracy[move]:
+            return move_name, effectiveness, None
         
-        # Calculate and apply damage
-        damage = attacker.calculate_damage(move_power, atk_stat, def_stat, effectiveness)
-        defender.current_hp -= damage
-        
-        # Log the attack
-        effectiveness_text = ""
-        if effectiveness > 1:
-            effectiveness_text = "It's super effective!"
-        elif effectiveness < 1:
-            effectiveness_text = "It's not very effective..."
-            
-        self.log(f"{attacker.name} used {move_name}!")
-        if effectiveness_text:
-            self.log(effectiveness_text)
-        self.log(f"{defender.name} took {damage} damage!")
-        if defender.is_fainted():
-            self.log(f"{defender.name} fainted!")
+        # Calculate stats to use
+        if moves.categories[move] == PHYSICAL:
+            atk_stat, def_stat = attacker.attack, defender.defense
         else:
-            self.log(f"{defender.name} has {defender.current_hp} HP remaining!")
+            atk_stat, def_stat = attacker.sp_attack, defender.sp_defense
         
-    def simulate_battle(self, pokemon1_name: str, pokemon2_name: str) -> list:
-        """Simulate a battle between two Pokemon."""
-        # Reset battle log
-        self.battle_log = []
+        # Calculate and apply damage
+        damage = attacker.calculate_damage(int(moves.power[move]), atk_stat, def_stat, effectiveness,
+                                           0.85 + 0.15 * damage_roll)
+        defender.current_hp -= damage
+        return move_name, effectiveness, damage
         
-        # Get Pokemon data
-        pokemon1_data = self.pokemon_df[self.pokemon_df['name'] == pokemon1_name].iloc[0]
-        pokemon2_data = self.pokemon_df[self.pokemon_df['name'] == pokemon2_name].iloc[0]
+    def play(self, progress=None):
+        """Play the battle, yielding (turn, attacker, defender, move, effectiveness, damage).
         
-        # Create Pokemon instances
-        pokemon1 = Pokemon(pokemon1_data)
-        pokemon2 = Pokemon(pokemon2_data)
+        If given, progress(turn) is called at the start of every turn.
+        """
+        pokemon1, pokemon2 = self.pokemon1, self.pokemon2
         
-        self.log(f"Battle between {pokemon1.name} and {pokemon2.name} begins!")
+        # Determine turn order based on speed
+        if pokemon1.speed >= pokemon2.speed:
+            first, second = pokemon1, pokemon2
+        else:
+            first, second = pokemon2, pokemon1
         
         # Main battle loop
+        turn = 0
         while not (pokemon1.is_fainted() or pokemon2.is_fainted()):
-            # Determine turn order based on speed
-            if pokemon1.speed >= pokemon2.speed:
-                first, second = pokemon1, pokemon2
-            else:
-                first, second = pokemon2, pokemon1
-                
+            turn += 1
+            if turn > self.max_turns:
+                self.turns = self.max_turns
+                return
+            if progress is not None:
+                progress(turn)
+            if (turn - 1) % TURN_BLOCK == 0:
+                # Rolls for both attacks of the next block of turns
+                rolls = self.rng.random((TURN_BLOCK, 2, ATTACK_ROLLS)).tolist()
+            turn_rolls = rolls[(turn - 1) % TURN_BLOCK]
+            
             # First Pokemon attacks
-            self.simulate_turn(first, second)
+            yield (turn, first, second) + self.attack(first, second, turn_rolls[0])
             if second.is_fainted():
                 break
                 
             # Second Pokemon attacks
-            self.simulate_turn(second, first)
+            yield (turn, second, first) + self.attack(second, first, turn_rolls[1])
+        
+        self.turns = turn
+        self.winner = pokemon1 if pokemon2.is_fainted() else pokemon2
+        
+    def run(self) -> 'Battle':
+        """Play the battle to the end without producing any events."""
+        for _ in self.play():
+            pass
+        return self
+        
+    def events(self, progress=None):
+        """Play the battle, yielding a BattleEvent for everything that happens."""
+        yield BattleEvent('start', 0, self.pokemon1.name, self.pokemon2.name)
+        for turn, attacker, defender, move, effectiveness, damage in self.play(progress):
+            yield BattleEvent('attack', turn, attacker.name, defender.name, move,
+                              damage or 0, effectiveness, defender.current_hp, damage is None)
+        if self.winner is None:
+            yield BattleEvent('draw', self.turns)
+        else:
+            yield BattleEvent('win', self.turns, self.winner.name)
+
+class BattleSimulator:
+    """Class for simulating Pokemon battles.
+    
+    The simulator only holds the Pokemon data and a random stream; every
+    battle keeps its own state in a Battle, so one simulator is safe to share
+    between threads.
+    """
+    
+    def __init__(self, pokemon_df: pd.DataFrame, seed=None, moves: MoveTable = None):
+        """Initialize battle simulator with Pokemon data.
+        
+        seed may be an int, a SeedSequence or a numpy Generator; battles that
+        are not given their own seed draw from this stream. moves defaults to
+        the app's move table.
+        """
+        self.pokemon_df = pokemon_df
+        self.store = PokemonStore(pokemon_df)
+        self.rng = make_rng(seed)
+        self.moves = moves if moves is not None else get_move_table()
+        
+    def get_type_effectiveness(self, move_type: str, defender_types: list) -> float:
+        """Calculate type effectiveness multiplier."""
+        move_code = type_code(move_type)
+        effectiveness = 1.0
+        for def_type in defender_types:
+            effectiveness *= TYPE_MATRIX[move_code, type_code(def_type)]
+        return float(effectiveness)
+        
+    def battle(self, pokemon1_name: str, pokemon2_name: str,
+               max_turns: int = MAX_TURNS, seed=None, policies=(None, None)) -> Battle:
+        """Set up a battle between two Pokemon.
+
+        The battle is called a draw after max_turns turns. With a seed the
+        battle is reproducible; otherwise it draws from the simulator's stream.
+        policies holds each side's move policy, None for random moves.
+        """
+        rng = self.rng if seed is None else make_rng(seed)
+        return Battle(self, Pokemon(self.store.get(pokemon1_name)),
+                      Pokemon(self.store.get(pokemon2_name)), rng, max_turns, policies)
+        
+    def iter_battle(self, pokemon1_name: str, pokemon2_name: str,
+                    max_turns: int = MAX_TURNS, progress=None, seed=None, policies=(None, None)):
+        """Simulate a battle, yielding BattleEvents as it is played."""
+        return self.battle(pokemon1_name, pokemon2_name, max_turns, seed, policies).events(progress)
+        
+    def battle_winner(self, pokemon1_name: str, pokemon2_name: str,
+                      max_turns: int = MAX_TURNS, seed=None, policies=(None, None)):
+        """Simulate a battle without a log and get the winner's name, or None for a draw."""
+        winner = self.battle(pokemon1_name, pokemon2_name, max_turns, seed, policies).run().winner
+        return winner.name if winner is not None else None
+        
+    def simulate_battle(self, pokemon1_name: str, pokemon2_name: str,
+                        max_turns: int = MAX_TURNS, progress=None, seed=None,
+                        policies=(None, None)) -> list:
+        """Simulate a battle between two Pokemon and get its log lines."""
+        return [line for event in self.iter_battle(pokemon1_name, pokemon2_name, max_turns, progress,
+                                                   seed, policies)
+                for line in format_event(event)]
+
+    def damage_tables(self, attacker: Pokemon, defender: Pokemon) -> DamageTables:
+        """Get the DamageTables of one attacker against one defender."""
+        store = self.store
+        return DamageTables(store.stats, store.type1, store.type2, [store.index_of(attacker.name)],
+                            [store.index_of(defender.name)], self.moves)
+
+    def _batch_attack(self, attacker: Pokemon, defender: Pokemon, policy):
+        """Get attack(attacker_hp, defender_hp, rolls) resolving a batch of attacks for simulate_many."""
+        if policy is None:
+            tables = self.damage_tables(attacker, defender)
+            # Every battle uses row 0 of the single-pair tables
+            return lambda attacker_hp, defender_hp, rolls: tables.roll(np.zeros(len(defender_hp), np.intp), rolls)
+        table, reply = policy.table(attacker, defender), policy.table(defender, attacker)
+        return lambda attacker_hp, defender_hp, rolls: table.roll(
+            policy.choose_many(table, reply, attacker_hp, defender_hp), rolls)
+
+    def simulate_many(self, pokemon1_name: str, pokemon2_name: str, n: int = 1000,
+                      seed=None, policies=(None, None), max_turns: int = MAX_TURNS) -> dict:
+        """Simulate n independent battles at once and summarise the outcomes.
+
+        Every battle follows the same rules as simulate_battle, including the
+        draw after max_turns turns, but all of them advance together as NumPy
+        arrays and no battle log is produced. The rolls for every running
+        battle are drawn in one call per turn.
+        """
+        pokemon1 = Pokemon(self.store.get(pokemon1_name))
+        pokemon2 = Pokemon(self.store.get(pokemon2_name))
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        rng = self.rng if seed is None else make_rng(seed)
+        
+        hp1 = np.full(n, pokemon1.hp, dtype=np.int64)
+        hp2 = np.full(n, pokemon2.hp, dtype=np.int64)
+        turns = np.zeros(n, dtype=np.int64)
+        
+        # Turn order is fixed by speed, so each side has a single damage table
+        if pokemon1.speed >= pokemon2.speed:
+            first_hp, second_hp = hp1, hp2
+            first_attack = self._batch_attack(pokemon1, pokemon2, policies[0])
+            second_attack = self._batch_attack(pokemon2, pokemon1, policies[1])
+        else:
+            first_hp, second_hp = hp2, hp1
+            first_attack = self._batch_attack(pokemon2, pokemon1, policies[1])
+            second_attack = self._batch_attack(pokemon1, pokemon2, policies[0])
+        
+        # Indices of battles that are still running
+        active = np.arange(n)
+        turn = 0
+        while active.size and turn < max_turns:
+            turn += 1
+            turns[active] += 1
+            rolls = rng.random((2, ATTACK_ROLLS, active.size))
             
-        # Determine winner
-        winner = pokemon1 if pokemon2.is_fainted() else pokemon2
-        self.log(f"\n{winner.name} wins the battle!")
+            # First Pokemon attacks
+            second_hp[active] -= first_attack(first_hp[active], second_hp[active], rolls[0])
+            alive = second_hp[active] > 0
+            active = active[alive]
+            
+            # Second Pokemon attacks
+            first_hp[active] -= second_attack(second_hp[active], first_hp[active], rolls[1][:, alive])
+            active = active[first_hp[active] > 0]
         
-        return self.battle_log 
+        # Battles still running at the turn limit are draws
+        return {
+            'pokemon1': pokemon1.name,
+            'pokemon2': pokemon2.name,
+            'battles': n,
+            'win_probability': float(np.mean(hp2 <= 0)),
+            'draw_probability': active.size / n,
+            'turn_histogram': np.bincount(turns),
+            'mean_turns': float(turns.mean()),
+            'hp_remaining': {
+                'pokemon1': self._hp_summary(hp1),
+                'pokemon2': self._hp_summary(hp2)
+            }
+        }
+
+    @staticmethod
+    def _hp_summary(hp: np.ndarray) -> dict:
+        """Summarise the HP left over across a batch of battles."""
+        hp_left = np.maximum(hp, 0)
+        return {
+            'mean': float(hp_left.mean()),
+            'std': float(hp_left.std()),
+            'min': int(hp_left.min()),
+            'max': int(hp_left.max())
+        }
@@ -0,0 +1,218 @@
+"""Round-robin tournament engine for the whole roster.
+
+Every pair of Pokemon fights battles_per_pair battles under the same rules
+as BattleSimulator.simulate_many, so a battle still running after MAX_TURNS
+turns is a draw and counts as a win for neither side. The upper triangle of the pair matrix is
+split into shards of consecutive pairs, and the shards are run on a
+ProcessPoolExecutor. Workers get the stat and type arrays and the move
+table once, when they start. After that, each task is just a shard number and its SeedSequence.
+Results go straight into a win-count matrix in shared memory. Each shard
+writes its own cells, so no locking is needed.
+
+Shard seeds are spawned from a single seed, so the result does not depend on
+the number of workers. A checkpoint file records the matrix and the finished
+shards, so an interrupted run can be resumed and gives the same result:
+
+    python -m app.battle.tournament --workers 4 --checkpoint tournament.npz
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from app.battle.simulator import ATTACK_ROLLS, MAX_TURNS, DamageTables
+from app.data.move_data import MoveTable, get_move_table
+from app.data.pokemon_data import STAT_INDEX, PokemonStore
+from app.utils.rng import make_rng, spawn_seeds
+
+# Pairs per shard, i.e. per worker task
+SHARD_SIZE = 8192
+
+# Seconds between checkpoint writes
+CHECKPOINT_INTERVAL = 30.0
+
+HP = STAT_INDEX['hp']
+SPEED = STAT_INDEX['speed']
+
+def simulate_pairs(stats, type1, type2, a, b, rng, moves: MoveTable = None,
+                   max_turns: int = MAX_TURNS) -> tuple:
+    """Fight one battle for each (a[k], b[k]) pair; get (a won, b won) bool arrays.
+
+    Battles still running after max_turns turns are draws, False in both.
+    """
+    moves = moves if moves is not None else get_move_table()
+
+    # The faster Pokemon attacks first, a on a speed tie
+    a_first = stats[a, SPEED] >= stats[b, SPEED]
+    first = np.where(a_first, a, b)
+    second = np.where(a_first, b, a)
+
+    first_tables = DamageTables(stats, type1, type2, first, second, moves)
+    second_tables = DamageTables(stats, type1, type2, second, first, moves)
+    first_hp = stats[first, HP].astype(np.int64)
+    second_hp = stats[second, HP].astype(np.int64)
+
+    # Indices of battles that are still running
+    active = np.arange(len(a))
+    turn = 0
+    while active.size and turn < max_turns:
+        turn += 1
+        rolls = rng.random((2, ATTACK_ROLLS, active.size))
+
+        # First Pokemon attacks
+        second_hp[active] -= first_tables.roll(active, rolls[0])
+        alive = second_hp[active] > 0
+        active = active[alive]
+
+        # Second Pokemon attacks
+        first_hp[active] -= second_tables.roll(active, rolls[1][:, alive])
+        active = active[first_hp[active] > 0]
+
+    first_won = second_hp <= 0
+    second_won = first_hp <= 0
+    return np.where(a_first, first_won, second_won), np.where(a_first, second_won, first_won)
+
+# Per-worker state, set by _init_worker
+_worker = {}
+
+def _init_worker(stats, type1, type2, moves, shm_name, battles_per_pair):
+    """Attach a worker process to the shared win matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    n = len(stats)
+    rows, cols = np.triu_indices(n, k=1)
+    _worker.update(
+        shm=shm,
+        wins=np.ndarray((n, n), dtype=np.int32, buffer=shm.buf),
+        stats=stats,
+        type1=type1,
+        type2=type2,
+        moves=moves,
+        rows=rows,
+        cols=cols,
+        battles_per_pair=battles_per_pair
+    )
+
+def _run_shard(shard, seed, shard_size):
+    """Fight every battle of a shard and write its cells of the win matrix."""
+    w = _worker
+    start = shard * shard_size
+    rows = w['rows'][start:start + shard_size]
+    cols = w['cols'][start:start + shard_size]
+    battles = w['battles_per_pair']
+
+    a_won, b_won = simulate_pairs(w['stats'], w['type1'], w['type2'],
+                                  np.repeat(rows, battles), np.repeat(cols, battles), make_rng(seed), w['moves'])
+    w['wins'][rows, cols] = a_won.reshape(-1, battles).sum(axis=1, dtype=np.int32)
+    w['wins'][cols, rows] = b_won.reshape(-1, battles).sum(axis=1, dtype=np.int32)
+    return shard, len(rows) * battles
+
+def _load_checkpoint(path, n, battles_per_pair, shard_size):
+    """Get (wins, finished shards, seed entropy) from a checkpoint, or None."""
+    if not (path and os.path.exists(path)):
+        return None
+    with np.load(path) as checkpoint:
+        if (checkpoint['wins'].shape != (n, n) or int(checkpoint['battles_per_pair']) != battles_per_pair
+                or int(checkpoint['shard_size']) != shard_size):
+            raise ValueError(f"Checkpoint {path} is for a different roster, battles_per_pair or shard_size")
+        return checkpoint['wins'], set(checkpoint['done'].tolist()), int(str(checkpoint['entropy']))
+
+def _save_checkpoint(path, wins, done, battles_per_pair, shard_size, entropy):
+    """Write a checkpoint atomically, so a crash never leaves a torn file."""
+    tmp_path = f'{path}.tmp.npz'
+    np.savez(tmp_path, wins=wins, done=np.array(sorted(done), dtype=np.int64),
+             battles_per_pair=battles_per_pair, shard_size=shard_size, entropy=str(entropy))
+    os.replace(tmp_path, path)
+
+def run_tournament(store: PokemonStore, battles_per_pair: int = 1, workers: int = None,
+                   seed=None, checkpoint_path: str = None, shard_size: int = SHARD_SIZE,
+                   report=print) -> dict:
+    """Run an all-vs-all tournament over every Pokemon in a store.
+
+    seed is an int; without one, a fresh seed is drawn and saved in the
+    checkpoint. If checkpoint_path exists, the run resumes from
+    it and its seed is used. Returns a dict with the win matrix (wins[i, j] is
+    how many times Pokemon i beat Pokemon j), the names and throughput figures.
+    """
+    if battles_per_pair < 1:
+        raise ValueError("battles_per_pair must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    n = len(store)
+    n_shards = -(-(n * (n - 1) // 2) // shard_size)
+
+    checkpoint = _load_checkpoint(checkpoint_path, n, battles_per_pair, shard_size)
+    if checkpoint is not None:
+        saved_wins, done, entropy = checkpoint
+    else:
+        saved_wins, done = None, set()
+        entropy = np.random.SeedSequence(seed).entropy
+    shard_seeds = spawn_seeds(np.random.SeedSequence(entropy), n_shards)
+
+    shm = shared_memory.SharedMemory(create=True, size=n * n * np.dtype(np.int32).itemsize)
+    try:
+        wins = np.ndarray((n, n), dtype=np.int32, buffer=shm.buf)
+        wins[:] = saved_wins if saved_wins is not None else 0
+
+        pending = [shard for shard in range(n_shards) if shard not in done]
+        battles = 0
+        start = last_checkpoint = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(store.stats, store.type1, store.type2, get_move_table(),
+                                               shm.name, battles_per_pair)) as pool:
+                futures = [pool.submit(_run_shard, shard, shard_seeds[shard], shard_size)
+                           for shard in pending]
+                for future in as_completed(futures):
+                    shard, shard_battles = future.result()
+                    done.add(shard)
+                    battles += shard_battles
+                    if checkpoint_path and time.perf_counter() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                        _save_checkpoint(checkpoint_path, wins, done, battles_per_pair,
+                                         shard_size, entropy)
+                        last_checkpoint = time.perf_counter()
+        finally:
+            # Keep whatever finished, including on Ctrl+C
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, wins, done, battles_per_pair, shard_size, entropy)
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'names': list(store.names),
+            'wins': wins.copy(),
+            'battles_per_pair': battles_per_pair,
+            'battles': battles,
+            'elapsed': elapsed,
+            'workers': workers,
+            'battles_per_second_per_core': battles / elapsed / workers if elapsed > 0 else 0.0
+        }
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if report is not None:
+        report(f"{battles:,} battles in {elapsed:.1f}s on {workers} worker(s): "
+               f"{result['battles_per_second_per_core']:,.0f} battles/s per core "
+               f"({len(pending)} of {n_shards} shards run)")
+    return result
+
+def rankings(result: dict, top_n: int = None) -> list:
+    """Get (name, win rate) pairs from a tournament result, best first."""
+    n = len(result['names'])
+    win_rates = result['wins'].sum(axis=1) / (result['battles_per_pair'] * (n - 1))
+    order = np.argsort(-win_rates, kind='stable')[:top_n]
+    return [(result['names'][i], float(win_rates[i])) for i in order]
+
+if __name__ == '__main__':
+    import argparse
+    from app.data.pokemon_data import get_pokemon_store
+
+    parser = argparse.ArgumentParser(description="Run an all-vs-all tournament over the roster.")
+    parser.add_argument('--battles', type=int, default=1, help="battles per pair")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file to save to and resume from")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    result = run_tournament(get_pokemon_store(), args.battles, args.workers, args.seed, args.checkpoint)
+    for rank, (name, win_rate) in enumerate(rankings(result, args.top), 1):
+        print(f"{rank:3d}. {name:<15} {win_rate * 100:.1f}%")
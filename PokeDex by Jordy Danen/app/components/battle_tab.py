@@ -3,12 +3,14 @@ from dash import html, dcc
 import plotly.graph_objects as go
 from app.utils.constants import POKEMON_COLORS, TYPE_COLORS
 from app.utils.helpers import get_pokemon_image_url
-from app.data.pokemon_data import pokemon_df
+from app.data.pokemon_data import get_pokemon_data
 from app.battle.simulator import BattleSimulator
 from app.battle.predictor import BattlePredictor
 
 def create_battle_tab():
     """Create the battle tab component."""
+    pokemon_df = get_pokemon_data()
+    
     return html.Div([
         # Pokemon Selection Section
         html.Div([
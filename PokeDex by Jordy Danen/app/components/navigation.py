@@ -1,11 +1,11 @@
 """Navigation components module."""
 from dash import html
 
-def create_navigation_buttons(df, current_pokemon):
+def create_navigation_buttons(store, current_pokemon):
     """Create navigation buttons for previous/next Pokemon and return to list."""
-    current_number = df[df['name'] == current_pokemon]['pokedex_number'].iloc[0]
-    prev_pokemon = df[df['pokedex_number'] == current_number - 1]['name'].iloc[0] if current_number > 1 else None
-    next_pokemon = df[df['pokedex_number'] == current_number + 1]['name'].iloc[0] if current_number < df['pokedex_number'].max() else None
+    current_number = store.get(current_pokemon)['pokedex_number']
+    prev_pokemon = store.name_for_number(current_number - 1)
+    next_pokemon = store.name_for_number(current_number + 1)
     
     return html.Div([
         # Navigation row
@@ -1,51 +1,167 @@
-"""Pokemon grid component module."""
-from dash import html
+"""Pokemon grid component module.
+
+Only one page of cards is rendered at a time. Further pages and
+name/type/generation filters are served by a callback from a
+PokemonGridIndex, so the page stays the same size however large the
+dataset gets.
+"""
+from dash import html, dcc
+import numpy as np
 from app.utils.helpers import get_pokemon_image_url
 from app.utils.constants import POKEMON_COLORS
+from app.utils.type_index import TYPE_CODES, TYPE_NAMES, encode_types
+
+PAGE_SIZE = 48
+
+class PokemonGridIndex:
+    """Pokedex-ordered arrays used to filter and page the grid."""
+
+    def __init__(self, df):
+        ordered = df.sort_values('pokedex_number')
+        self.numbers = ordered['pokedex_number'].to_numpy()
+        self.names = ordered['name'].to_numpy(dtype=str)
+        self.search_names = np.char.lower(self.names)
+        self.type1 = encode_types(ordered['type1'])
+        self.type2 = encode_types(ordered['type2'])
+        self.generations = ordered['generation'].to_numpy()
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, name=None, type_name=None, generation=None):
+        """Get the positions of the Pokemon matching all given filters."""
+        mask = np.ones(len(self), dtype=bool)
+        if name:
+            mask &= np.char.find(self.search_names, name.strip().lower()) >= 0
+        if type_name:
+            code = TYPE_CODES[type_name]
+            mask &= (self.type1 == code) | (self.type2 == code)
+        if generation:
+            mask &= self.generations == int(generation)
+        return np.flatnonzero(mask)
+
+    def page(self, positions, page):
+        """Get the (number, name) pairs shown on a page of the matches."""
+        window = positions[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        return list(zip(self.numbers[window].tolist(), self.names[window].tolist()))
+
+    def page_count(self, positions):
+        return max(1, -(-len(positions) // PAGE_SIZE))
+
+# Grid indexes and first-page layouts by dataset version, built once each
+_index_cache = {}
+_grid_cache = {}
 
-def create_pokemon_grid(df):
-    """Create the Pokemon grid component."""
+def get_grid_index(df, version):
+    """Get the grid index for a dataset version, building it on first use."""
+    if version not in _index_cache:
+        _index_cache[version] = PokemonGridIndex(df)
+    return _index_cache[version]
+
+def get_pokemon_grid(df, version):
+    """Get the Pokemon grid for a dataset version, building it on first use."""
+    if version not in _grid_cache:
+        _grid_cache[version] = create_pokemon_grid(get_grid_index(df, version))
+    return _grid_cache[version]
+
+def create_pokemon_card(number, name):
+    """Create a single clickable Pokemon card."""
     return html.Div([
+        # The sprite is only requested once the card scrolls into view (see static/lazy_images.js)
+        html.Img(
+            className='lazy-sprite',
+            style={
+                'width': '50px',
+                'height': '50px',
+                'imageRendering': 'pixelated'
+            },
+            **{'data-src': get_pokemon_image_url(number)}
+        ),
+        html.Div(
+            f"#{number} {name}",
+            style={
+                'fontSize': '12px',
+                'fontFamily': POKEMON_COLORS['pixel_font'],
+                'color': 'white',
+                'textAlign': 'center',
+                'marginTop': '5px'
+            }
+        )
+    ],
+    id={'type': 'pokemon-select', 'index': name},
+    className='pokemon-grid-item',
+    style={
+        'display': 'flex',
+        'flexDirection': 'column',
+        'alignItems': 'center',
+        'padding': '10px',
+        'backgroundColor': '#2c3e50',
+        'borderRadius': '8px',
+        'cursor': 'pointer',
+        'transition': 'all 0.3s ease'
+    })
+
+def create_grid_page(grid_index, positions, page):
+    """Create the cards for one page of matching Pokemon."""
+    if len(positions) == 0:
+        return [html.Div("No Pokémon found", style={'fontFamily': POKEMON_COLORS['pixel_font'],
+                                                   'fontSize': '12px', 'color': 'white'})]
+    return [create_pokemon_card(number, name) for number, name in grid_index.page(positions, page)]
+
+def create_pokemon_grid(grid_index):
+    """Create the Pokemon grid component, showing the first page."""
+    positions = grid_index.search()
+    control_style = {'fontFamily': POKEMON_COLORS['pixel_font'], 'fontSize': '10px'}
+    
+    return html.Div([
+        # Filters
         html.Div([
-            html.Div([
-                html.Img(
-                    src=get_pokemon_image_url(row['pokedex_number']),
-                    style={
-                        'width': '50px',
-                        'height': '50px',
-                        'imageRendering': 'pixelated'
-                    }
-                ),
-                html.Div(
-                    f"#{row['pokedex_number']} {row['name']}",
-                    style={
-                        'fontSize': '12px',
-                        'fontFamily': POKEMON_COLORS['pixel_font'],
-                        'color': 'white',
-                        'textAlign': 'center',
-                        'marginTop': '5px'
-                    }
-                )
-            ],
-            id={'type': 'pokemon-select', 'index': row['name']},
-            className='pokemon-grid-item',
+            dcc.Input(
+                id='grid-search',
+                type='text',
+                placeholder='Search name',
+                debounce=True,
+                style={**control_style, 'flex': '2', 'padding': '8px'}
+            ),
+            dcc.Dropdown(
+                id='grid-type-filter',
+                options=[{'label': name.capitalize(), 'value': name} for name in TYPE_NAMES],
+                placeholder='Any type',
+                style={**control_style, 'flex': '1'}
+            ),
+            dcc.Dropdown(
+                id='grid-generation-filter',
+                options=[{'label': f'Gen {gen}', 'value': int(gen)} for gen in np.unique(grid_index.generations)],
+                placeholder='Any generation',
+                style={**control_style, 'flex': '1'}
+            )
+        ], style={'display': 'flex', 'gap': '10px', 'padding': '20px 20px 0 20px'}),
+        
+        # Current page of cards
+        html.Div(
+            create_grid_page(grid_index, positions, 0),
+            id='grid-page',
             style={
-                'display': 'flex',
-                'flexDirection': 'column',
-                'alignItems': 'center',
-                'padding': '10px',
-                'backgroundColor': '#2c3e50',
-                'borderRadius': '8px',
-                'cursor': 'pointer',
-                'transition': 'all 0.3s ease'
+                'display': 'grid',
+                'gridTemplateColumns': 'repeat(auto-fill, minmax(100px, 1fr))',
+                'gap': '10px',
+                'padding': '20px',
+                'maxHeight': '70vh',
+                'overflowY': 'auto'
             }
-            ) for _, row in df.sort_values('pokedex_number').iterrows()
-        ], style={
-            'display': 'grid',
-            'gridTemplateColumns': 'repeat(auto-fill, minmax(100px, 1fr))',
-            'gap': '10px',
-            'padding': '20px',
-            'maxHeight': '70vh',
-            'overflowY': 'auto'
-        })
+        ),
+        
+        # Paging controls
+        html.Div([
+            html.Button('<', id='grid-prev', n_clicks=0, className='nav-button', disabled=True),
+            html.Span(
+                f"Page 1 / {grid_index.page_count(positions)}",
+                id='grid-page-label',
+                style={**control_style, 'color': 'white'}
+            ),
+            html.Button('>', id='grid-next', n_clicks=0, className='nav-button',
+                        disabled=grid_index.page_count(positions) <= 1),
+            dcc.Store(id='grid-page-number', data=0)
+        ], style={'display': 'flex', 'justifyContent': 'center', 'alignItems': 'center',
+                  'gap': '20px', 'paddingBottom': '20px'})
     ], id='pokemon-grid') 
\ No newline at end of file
@@ -6,8 +6,8 @@ from app.utils.constants import POKEMON_COLORS, TYPE_COLORS
 
 def create_pokemon_info(pokemon):
     """Create the Pokemon information display."""
-    type1 = pokemon['type1'] if 'type1' in pokemon.index else pokemon['Type 1']
-    type2 = pokemon['type2'] if 'type2' in pokemon.index else pokemon['Type 2']
+    type1 = pokemon['type1']
+    type2 = pokemon['type2']
     
     return html.Div([
         html.Div([
@@ -115,9 +115,9 @@ def create_pokemon_info(pokemon):
                   'overflow': 'hidden'})
     ])
 
-def create_moves_display(df, pokemon):
+def create_moves_display(store, pokemon):
     """Create the moves display."""
-    moves = get_recommended_moves(df, pokemon['name'])
+    moves = get_recommended_moves(store, pokemon['name'])
     return html.Div([
         html.Div([
             html.H4("Recommended Moves",
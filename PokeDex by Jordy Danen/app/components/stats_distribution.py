@@ -0,0 +1,107 @@
+"""Stats distribution figure component.
+
+The box plots are drawn from precomputed quartiles and fences, so the base
+figure only carries a few numbers per stat plus the outliers instead of
+every Pokemon's stats. Selected Pokemon are drawn on top as stars, one
+trace (legend entry and color) per Pokemon, in MAX_OVERLAYS fixed slots from
+index BASE_TRACE_COUNT. A selection change overwrites every slot by index,
+unused ones with an empty trace, so it never depends on how many were shown.
+"""
+import numpy as np
+import plotly.colors
+import plotly.graph_objects as go
+from app.data.pokemon_data import STAT_COLUMNS
+
+def create_stats_distribution_figure(store):
+    """Create the base box-plot figure for all six stats."""
+    fig = go.Figure()
+    outlier_x = []
+    outlier_y = []
+    
+    for stat in STAT_COLUMNS:
+        values = store.stat(stat)
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        
+        # Whiskers end at the furthest values within 1.5 IQR, like plotly's own boxes
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        outliers = np.unique(values[(values < inside.min()) | (values > inside.max())])
+        outlier_x.extend([stat] * len(outliers))
+        outlier_y.extend(outliers.tolist())
+        
+        fig.add_trace(go.Box(
+            x=[stat],
+            q1=[q1],
+            median=[median],
+            q3=[q3],
+            lowerfence=[int(inside.min())],
+            upperfence=[int(inside.max())],
+            name=stat,
+            marker_color='lightgray',
+            showlegend=False
+        ))
+    
+    # Distinct outlier values only; repeated values would draw the same point
+    fig.add_trace(go.Scatter(
+        x=outlier_x,
+        y=outlier_y,
+        mode='markers',
+        marker=dict(color='lightgray', size=4),
+        hoverinfo='y',
+        showlegend=False
+    ))
+    
+    # Empty until Pokemon are selected
+    fig.add_traces(create_stats_overlays(store, []))
+    
+    fig.update_layout(
+        title='Stats Distribution (Selected Pokemon shown as stars)',
+        yaxis_title='Value',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        # Add hover template
+        hovermode='closest',
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12
+        )
+    )
+    return fig
+
+# Index of the first overlay slot, after one box per stat and the outliers
+BASE_TRACE_COUNT = len(STAT_COLUMNS) + 1
+
+# Star colors, in the same order as the traces of the stats comparison chart
+OVERLAY_COLORS = plotly.colors.qualitative.Plotly
+
+# Overlay slots; Pokemon selected beyond this many are not starred
+MAX_OVERLAYS = 2 * len(OVERLAY_COLORS)
+
+def create_stats_overlay(store, pokemon_name, slot):
+    """Create the star-marker trace of one selected Pokemon, colored by its slot."""
+    return go.Scatter(
+        x=list(STAT_COLUMNS),
+        y=[int(value) for value in store.get(pokemon_name).stats],
+        mode='markers',
+        name=pokemon_name,
+        marker=dict(
+            size=10,
+            symbol='star',
+            line=dict(width=2),
+            color=OVERLAY_COLORS[slot % len(OVERLAY_COLORS)]
+        ),
+        showlegend=True
+    )
+
+def create_stats_overlays(store, pokemon_names):
+    """Create the traces of every overlay slot, empty past the selected Pokemon."""
+    names = list(pokemon_names)[:MAX_OVERLAYS]
+    return [create_stats_overlay(store, names[slot], slot) if slot < len(names)
+            else go.Scatter(x=[], y=[], showlegend=False)
+            for slot in range(MAX_OVERLAYS)]
@@ -1,41 +1,79 @@
 """Dashboard callbacks module."""
-from dash import Input, Output, State, ALL, callback_context, html, dcc, no_update
+from dash import Input, Output, State, ALL, ClientsideFunction, Patch, callback_context, html, dcc, no_update
 import plotly.graph_objects as go
-import pandas as pd
-from app.components.pokemon_grid import create_pokemon_grid
+from app.components.pokemon_grid import get_grid_index, create_grid_page
 from app.components.pokemon_info import create_pokemon_info, create_moves_display
 from app.components.navigation import create_navigation_buttons
-from app.data.pokemon_data import pokemon_df
+from app.components.stats_distribution import BASE_TRACE_COUNT, create_stats_overlays
+from app.data.pokemon_data import get_pokemon_data, get_pokemon_store, dataset_hash
+
+# Grid and detail visibility; switching views only sends these small style dicts
+SHOWN = {'width': '100%'}
+HIDDEN = {'width': '100%', 'display': 'none'}
+LIST_VIEW = [SHOWN, HIDDEN, no_update]
 
 def register_callbacks(app):
     """Register all callbacks for the dashboard."""
+    pokemon_df = get_pokemon_data()
+    pokemon_store = get_pokemon_store()
+    grid_index = get_grid_index(pokemon_df, dataset_hash())
+    
+    @app.callback(
+        [Output('grid-page', 'children'),
+         Output('grid-page-label', 'children'),
+         Output('grid-page-number', 'data'),
+         Output('grid-prev', 'disabled'),
+         Output('grid-next', 'disabled')],
+        [Input('grid-search', 'value'),
+         Input('grid-type-filter', 'value'),
+         Input('grid-generation-filter', 'value'),
+         Input('grid-prev', 'n_clicks'),
+         Input('grid-next', 'n_clicks')],
+        [State('grid-page-number', 'data')],
+        prevent_initial_call=True
+    )
+    def update_grid_page(search, type_name, generation, prev_clicks, next_clicks, page):
+        positions = grid_index.search(search, type_name, generation)
+        page_count = grid_index.page_count(positions)
+        
+        # Paging moves one page; any filter change starts from the first page
+        triggered_id = callback_context.triggered[0]['prop_id'] if callback_context.triggered else ''
+        if triggered_id == 'grid-prev.n_clicks':
+            page = max(page - 1, 0)
+        elif triggered_id == 'grid-next.n_clicks':
+            page = min(page + 1, page_count - 1)
+        else:
+            page = 0
+        
+        return (create_grid_page(grid_index, positions, page), f"Page {page + 1} / {page_count}",
+                page, page == 0, page >= page_count - 1)
     
     @app.callback(
-        [Output('pokemon-display', 'children'),
+        [Output('pokemon-grid', 'style'),
+         Output('pokemon-display', 'style'),
+         Output('pokemon-display', 'children'),
          Output('tabs', 'value', allow_duplicate=True),
          Output('pokemon1-select', 'value', allow_duplicate=True)],
         [Input('home-button', 'n_clicks'),
          Input({'type': 'pokemon-select', 'index': ALL}, 'n_clicks'),
          Input({'type': 'battle-button', 'pokemon': ALL}, 'n_clicks')],
-        [State({'type': 'pokemon-select', 'index': ALL}, 'id'),
-         State({'type': 'battle-button', 'pokemon': ALL}, 'id')],
         prevent_initial_call=True
     )
-    def update_selected_pokemon(home_clicks, pokemon_clicks, battle_clicks, pokemon_ids, battle_ids):
+    def update_selected_pokemon(home_clicks, pokemon_clicks, battle_clicks):
         ctx = callback_context
         if not ctx.triggered:
-            return create_pokemon_grid(pokemon_df), no_update, no_update
+            return LIST_VIEW + [no_update, no_update]
         
         triggered_id = ctx.triggered[0]['prop_id']
         
         # Handle home button click
         if triggered_id == 'home-button.n_clicks':
-            return create_pokemon_grid(pokemon_df), 'Pokédex Entry', no_update
+            return LIST_VIEW + ['Pokédex Entry', no_update]
         
         # Handle battle button click
         if '.n_clicks' in triggered_id and 'battle-button' in triggered_id:
             pokemon_name = eval(triggered_id.split('.')[0])['pokemon']
-            return create_pokemon_grid(pokemon_df), 'Battle Simulator', pokemon_name
+            return LIST_VIEW + ['Battle Simulator', pokemon_name]
         
         # Handle Pokemon selection
         if '.n_clicks' in triggered_id:
@@ -43,121 +81,36 @@ def register_callbacks(app):
             
             # Check for return to list
             if pokemon_name == 'return':
-                return create_pokemon_grid(pokemon_df), no_update, no_update
+                return LIST_VIEW + [no_update, no_update]
                 
             if not pokemon_name:
-                return create_pokemon_grid(pokemon_df), no_update, no_update
+                return LIST_VIEW + [no_update, no_update]
                 
-            pokemon = pokemon_df[pokemon_df['name'] == pokemon_name].iloc[0]
+            pokemon = pokemon_store.get(pokemon_name)
             
             # Create Pokemon info display with navigation
-            return html.Div([
-                create_navigation_buttons(pokemon_df, pokemon_name),
+            return [HIDDEN, SHOWN, html.Div([
+                create_navigation_buttons(pokemon_store, pokemon_name),
                 create_pokemon_info(pokemon),
-                create_moves_display(pokemon_df, pokemon)
-            ]), no_update, no_update
+                create_moves_display(pokemon_store, pokemon)
+            ]), no_update, no_update]
     
-    @app.callback(
-        [Output('gen-button-' + str(i), 'className') for i in sorted(pokemon_df['generation'].unique())] +
-        [Output('active-generations', 'children')],
-        [Input('gen-button-' + str(i), 'n_clicks') for i in sorted(pokemon_df['generation'].unique())]
-    )
-    def update_button_states(*args):
-        ctx = callback_context
-        
-        # Initialize all generations as active on first load
-        if not ctx.triggered or ctx.triggered[0]['prop_id'] == '.':
-            active_gens = list(sorted(pokemon_df['generation'].unique()))
-            return ['gen-button active'] * len(active_gens) + [str(active_gens)]
-        
-        # Get which button was clicked
-        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        clicked_gen = int(button_id.split('-')[-1])
-        
-        # Get current states
-        button_states = []
-        active_gens = []
-        
-        # Get all button states
-        for i in sorted(pokemon_df['generation'].unique()):
-            button_key = f'gen-button-{i}.className'
-            # Default to active if state not found
-            current_state = 'gen-button active'
-            
-            # Only toggle the clicked button
-            if i == clicked_gen:
-                if button_key in ctx.states and 'active' in ctx.states[button_key]:
-                    current_state = 'gen-button'  # Deactivate if it was active
-                else:
-                    current_state = 'gen-button active'  # Activate if it was inactive
-            else:
-                # Keep existing state or default to active
-                if button_key in ctx.states:
-                    current_state = ctx.states[button_key]
-            
-            button_states.append(current_state)
-            if 'active' in current_state:
-                active_gens.append(i)
-        
-        # Ensure at least one generation is active
-        if not active_gens:
-            active_gens = [clicked_gen]
-            button_states[sorted(pokemon_df['generation'].unique()).index(clicked_gen)] = 'gen-button active'
-        
-        return button_states + [str(active_gens)]
-
-    @app.callback(
-        [Output('primary-type-dist', 'figure'),
+    # Generation toggles and type charts are recomputed in the browser
+    # (static/type_analysis.js) from the precomputed type-distribution-data
+    generations = sorted(pokemon_df['generation'].unique())
+    app.clientside_callback(
+        ClientsideFunction(namespace='pokedex', function_name='updateTypeAnalysis'),
+        [Output(f'gen-button-{i}', 'className') for i in generations] +
+        [Output('active-generations', 'children'),
+         Output('primary-type-dist', 'figure'),
          Output('type-heatmap', 'figure')],
-        [Input('active-generations', 'children')]
+        [Input(f'gen-button-{i}', 'n_clicks') for i in generations],
+        [State(f'gen-button-{i}', 'className') for i in generations] +
+        [State('type-distribution-data', 'data')]
     )
-    def update_type_distributions(active_gens_str):
-        try:
-            selected_generations = [int(x.strip()) for x in active_gens_str.strip('[]').split(',') if x.strip()]
-        except:
-            selected_generations = list(sorted(pokemon_df['generation'].unique()))
-        
-        # Create simpler bar chart
-        type_dist_data = []
-        for gen in selected_generations:
-            type_counts = pokemon_df[pokemon_df['generation'] == gen]['type1'].value_counts()
-            type_dist_data.append(
-                go.Bar(
-                    name=f'Gen {gen}',
-                    x=sorted(pokemon_df['type1'].unique()),
-                    y=[type_counts.get(t, 0) for t in sorted(pokemon_df['type1'].unique())]
-                )
-            )
-        
-        type_dist_fig = {
-            'data': type_dist_data,
-            'layout': {
-                'title': 'Type Distribution by Generation',
-                'barmode': 'group',
-                'template': 'plotly_dark'
-            }
-        }
-        
-        # Create simpler heatmap
-        filtered_df = pokemon_df[pokemon_df['generation'].isin(selected_generations)]
-        type_combinations = pd.crosstab(filtered_df['type1'], filtered_df['type2'])
-        
-        heatmap_fig = {
-            'data': [
-                go.Heatmap(
-                    z=type_combinations.values,
-                    x=type_combinations.columns,
-                    y=type_combinations.index
-                )
-            ],
-            'layout': {
-                'title': 'Type Combinations Heatmap',
-                'template': 'plotly_dark'
-            }
-        }
-        
-        return type_dist_fig, heatmap_fig
 
+    max_stat = int(pokemon_store.stats.max())
+    
     @app.callback(
         [Output('stats-comparison', 'figure'),
          Output('stats-distribution', 'figure')],
@@ -173,7 +126,7 @@ def register_callbacks(app):
         
         comparison_fig = go.Figure()
         for pokemon_name in selected_pokemon:
-            pokemon = pokemon_df[pokemon_df['name'] == pokemon_name].iloc[0]
+            pokemon = pokemon_store.get(pokemon_name)
             stat_values = [pokemon[stat] for stat in stats]
             
             comparison_fig.add_trace(go.Scatterpolar(
@@ -184,7 +137,7 @@ def register_callbacks(app):
             ))
         
         comparison_fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, pokemon_df[stats].max().max() * 1.2])),
+            polar=dict(radialaxis=dict(visible=True, range=[0, max_stat * 1.2])),
             showlegend=True,
             title='Stats Comparison',
             plot_bgcolor='rgba(0,0,0,0.1)',
@@ -192,52 +145,10 @@ def register_callbacks(app):
             font_color='white'
         )
         
-        # Stats distribution boxplots with selected Pokemon highlighted
-        stats_dist_fig = go.Figure()
-        
-        # Add boxplots for each stat
-        for stat in stats:
-            stats_dist_fig.add_trace(go.Box(
-                y=pokemon_df[stat],
-                name=stat,
-                boxpoints='outliers',
-                marker_color='lightgray',
-                showlegend=False
-            ))
-            
-            # Add markers for selected Pokemon
-            for pokemon_name in selected_pokemon:
-                pokemon = pokemon_df[pokemon_df['name'] == pokemon_name].iloc[0]
-                stats_dist_fig.add_trace(go.Scatter(
-                    x=[stat],
-                    y=[pokemon[stat]],
-                    mode='markers',
-                    name=pokemon_name,
-                    marker=dict(
-                        size=10,
-                        symbol='star',
-                        line=dict(width=2)
-                    ),
-                    showlegend=True
-                ))
-        
-        stats_dist_fig.update_layout(
-            title='Stats Distribution (Selected Pokemon shown as stars)',
-            yaxis_title='Value',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            # Add hover template
-            hovermode='closest',
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12
-            )
-        )
+        # Replace only the star overlays on top of the base box plots; every
+        # slot has a fixed index, so the patch is right whatever was shown before
+        stats_dist_patch = Patch()
+        for slot, overlay in enumerate(create_stats_overlays(pokemon_store, selected_pokemon)):
+            stats_dist_patch['data'][BASE_TRACE_COUNT + slot] = overlay
         
-        return comparison_fig, stats_dist_fig 
\ No newline at end of file
+        return comparison_fig, stats_dist_patch 
\ No newline at end of file
@@ -2,11 +2,16 @@
 from dash import html, dcc
 from app.utils.constants import POKEMON_COLORS
 from app.utils.helpers import get_pokemon_image_url
-from app.components.pokemon_grid import create_pokemon_grid
-from app.data.pokemon_data import pokemon_df
+from app.components.pokemon_grid import get_pokemon_grid
+from app.components.stats_distribution import create_stats_distribution_figure
+from app.data.pokemon_data import get_pokemon_data, get_pokemon_store, dataset_hash, get_type_distribution_data
 
 def create_layout(app=None):
     """Create the main dashboard layout."""
+    # The data is loaded when the layout is built, not when this module is imported
+    pokemon_df = get_pokemon_data()
+    pokemon_store = get_pokemon_store()
+    
     return html.Div([
         # Pokedex outer shell
         html.Div([
@@ -49,7 +54,9 @@ def create_layout(app=None):
                                            'backgroundColor': POKEMON_COLORS['pokeball_red'],
                                            'color': POKEMON_COLORS['pokeball_white']},
                             children=[
-                                html.Div(id='pokemon-display', children=create_pokemon_grid(pokemon_df), style={'width': '100%'})
+                                # The grid stays in the page and is hidden while a Pokemon is shown
+                                get_pokemon_grid(pokemon_df, dataset_hash()),
+                                html.Div(id='pokemon-display', style={'width': '100%', 'display': 'none'})
                             ]),
                     
                     # Type Analysis Tab
@@ -80,7 +87,9 @@ def create_layout(app=None):
                                         ], style={'display': 'flex', 'gap': '10px', 'flexWrap': 'wrap'})
                                     ], id='generation-buttons'),
                                     # Hidden div to store active generations
-                                    html.Div(id='active-generations', style={'display': 'none'})
+                                    html.Div(id='active-generations', style={'display': 'none'}),
+                                    # Type counts per generation, combined in the browser on each toggle
+                                    dcc.Store(id='type-distribution-data', data=get_type_distribution_data(pokemon_df))
                                 ], style={'marginBottom': '20px'}),
                                 
                                 # Type distribution plots
@@ -141,7 +150,9 @@ def create_layout(app=None):
                                         dcc.Graph(id='stats-comparison')
                                     ]),
                                     html.Div([
-                                        dcc.Graph(id='stats-distribution')
+                                        # Base boxes are sent once; selections only patch the star overlay
+                                        dcc.Graph(id='stats-distribution',
+                                                  figure=create_stats_distribution_figure(pokemon_store))
                                     ])
                                 ])
                             ]),
@@ -262,7 +273,25 @@ def create_layout(app=None):
                                                       className='gen-button active',
                                                       style={'width': '100%',
                                                              'padding': '15px 30px',
-                                                             'fontSize': '14px'})
+                                                             'fontSize': '14px'}),
+                                            # How both sides pick their moves
+                                            dcc.Dropdown(
+                                                id='battle-policy',
+                                                options=[{'label': 'Random moves', 'value': 'random'},
+                                                         {'label': 'Greedy AI', 'value': 'greedy'},
+                                                         {'label': 'Expectimax AI', 'value': 'expectimax'}],
+                                                value='random',
+                                                clearable=False,
+                                                style={'marginTop': '10px',
+                                                       'fontFamily': POKEMON_COLORS['pixel_font']}
+                                            ),
+                                            # Shown only while a battle is running
+                                            html.Progress(id='battle-progress',
+                                                          style={'display': 'none'}),
+                                            html.Button("Cancel",
+                                                      id='cancel-battle-btn',
+                                                      className='gen-button',
+                                                      style={'display': 'none'})
                                         ], style={'width': '20%',
                                                  'display': 'flex',
                                                  'flexDirection': 'column',
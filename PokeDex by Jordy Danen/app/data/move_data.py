@@ -0,0 +1,105 @@
+"""Module for loading the move table used by the battle simulators.
+
+moves.csv (next to pokemon.csv) lists every move with its type, category,
+power and accuracy, plus an optional secondary status with its chance in
+percent and stat stage changes written as ``stat:stages:self|target``
+separated by semicolons. It is loaded once into parallel arrays indexed by
+move number. For every type, the numbers of its moves (and of its damaging
+moves) are precomputed, so picking a random move of a type is a single
+array lookup, and the batch engines can work on move numbers alone. Move
+numbers sorted by power answer power range queries with a binary search.
+"""
+import os
+import numpy as np
+import pandas as pd
+from app.utils.type_index import NUM_TYPES, encode_types
+
+CATEGORIES = ('physical', 'special', 'status')
+PHYSICAL, SPECIAL, STATUS = range(len(CATEGORIES))
+
+def get_moves_path():
+    """Get the absolute path to the move CSV file."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'moves.csv')
+
+def _parse_stat_changes(text) -> tuple:
+    """Parse 'defense:-1:self;speed:-1:target' into (stat, stages, on_user) tuples."""
+    if not isinstance(text, str) or not text:
+        return ()
+    changes = []
+    for change in text.split(';'):
+        stat, stages, target = change.split(':')
+        changes.append((stat, int(stages), target == 'self'))
+    return tuple(changes)
+
+class MoveTable:
+    """Columnar move table with per-type and per-category move indexes.
+
+    Every per-move attribute is an array (or list) indexed by move number.
+    by_type[code] and damaging_by_type[code] are int arrays of move numbers,
+    and by_category[category] does the same per category. by_power holds
+    every move number in order of power, for with_power. type_moves is a
+    dense (type, slot) array of damaging move numbers padded with -1, with
+    type_move_counts giving the number of real entries per type.
+    """
+
+    def __init__(self, moves_df: pd.DataFrame):
+        """Build the table from the raw move DataFrame."""
+        self.names = moves_df['name'].tolist()
+        self.types = encode_types(moves_df['type'])
+        self.categories = np.array([CATEGORIES.index(c) for c in moves_df['category']], dtype=np.int8)
+        self.power = moves_df['power'].to_numpy(dtype=np.int16)
+        self.accuracy = moves_df['accuracy'].to_numpy(dtype=np.int16)
+        self.effects = [effect if isinstance(effect, str) and effect else None for effect in moves_df['effect']]
+        self.effect_chances = moves_df['effect_chance'].to_numpy(dtype=np.int16)
+        self.stat_changes = [_parse_stat_changes(text) for text in moves_df['stat_changes']]
+        self._by_name = {name: i for i, name in enumerate(self.names)}
+
+        # Move numbers by type (NONE included, and always empty) and by category
+        damaging = self.power > 0
+        self.by_type = [np.flatnonzero(self.types == code) for code in range(NUM_TYPES + 1)]
+        self.damaging_by_type = [np.flatnonzero((self.types == code) & damaging) for code in range(NUM_TYPES + 1)]
+        self.by_category = [np.flatnonzero(self.categories == category) for category in range(len(CATEGORIES))]
+        self.by_power = np.argsort(self.power, kind='stable')
+        self._sorted_power = self.power[self.by_power]
+
+        # Dense form of damaging_by_type for vectorized lookups
+        self.type_move_counts = np.array([len(moves) for moves in self.damaging_by_type], dtype=np.intp)
+        self.type_moves = np.full((NUM_TYPES + 1, max(1, self.type_move_counts.max())), -1, dtype=np.intp)
+        for code, moves in enumerate(self.damaging_by_type):
+            self.type_moves[code, :len(moves)] = moves
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, move_name: str) -> bool:
+        return move_name in self._by_name
+
+    def index_of(self, move_name: str) -> int:
+        """Get the move number of a move by name."""
+        return self._by_name[move_name]
+
+    def with_power(self, low: int, high: int = None) -> np.ndarray:
+        """Get the numbers of the moves with low <= power <= high (no upper bound without high), weakest first."""
+        start = np.searchsorted(self._sorted_power, low, side='left')
+        stop = len(self) if high is None else np.searchsorted(self._sorted_power, high, side='right')
+        return self.by_power[start:stop]
+
+    def pick_damaging(self, type_code: int, roll: float) -> int:
+        """Get the damaging move of a type that a uniform roll in [0, 1) lands on."""
+        moves = self.damaging_by_type[type_code]
+        return int(moves[int(roll * len(moves))])
+
+def load_move_table(moves_path=None) -> MoveTable:
+    """Load the move table from its CSV file."""
+    return MoveTable(pd.read_csv(moves_path or get_moves_path()))
+
+# Loaded on first use
+_move_table = None
+
+def get_move_table() -> MoveTable:
+    """Get the app's move table, loading it on first use."""
+    global _move_table
+    if _move_table is None:
+        _move_table = load_move_table()
+    return _move_table
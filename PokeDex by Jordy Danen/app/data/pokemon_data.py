@@ -1,16 +1,289 @@
-"""Module for loading and processing Pokemon data."""
+"""Module for loading and processing Pokemon data.
+
+The CSV is compiled once into a binary columnar cache next to it: one .npy
+array per column dtype (one row per column) and a string table for the text
+columns, in a directory named after the CSV's content hash. Loading memory-maps the
+numeric columns, so there is no text parsing after the first run and
+forked worker processes share the same pages. The module-level pokemon_df
+and pokemon_store are loaded on first access rather than at import time.
+"""
 import pandas as pd
+import numpy as np
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+from app.utils.type_index import NO_TYPE, TYPE_NAMES, encode_types
 
-def load_pokemon_data():
-    """Load Pokemon data from CSV file."""
-    # Get the absolute path to the data file
+STAT_COLUMNS = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_COLUMNS)}
+
+# Bumped whenever the binary cache layout changes
+CACHE_FORMAT = 1
+
+def get_data_path():
+    """Get the absolute path to the Pokemon CSV file."""
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'pokemon.csv')
-    
-    # Load the data
+    return os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'pokemon.csv')
+
+def get_cache_dir(data_path=None):
+    """Get the binary cache directory for a CSV file's current contents."""
+    data_path = os.path.abspath(data_path or get_data_path())
+    return os.path.join(os.path.dirname(data_path), '.pokemon_cache',
+                        f'{dataset_hash(data_path)}-v{CACHE_FORMAT}')
+
+def compile_pokemon_cache(data_path=None):
+    """Parse the CSV once and write its binary columnar cache.
+
+    Numeric columns are grouped by dtype into one (columns, rows) .npy array
+    each. Text columns are saved the same way as int32 codes into a
+    per-column string table (-1 for missing values). The cache
+    directory is written under a temporary name and renamed when complete,
+    so a half-written cache is never loaded.
+    """
+    data_path = data_path or get_data_path()
+    cache_dir = get_cache_dir(data_path)
     df = pd.read_csv(data_path)
-    return df
+    
+    parent = os.path.dirname(cache_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+    try:
+        # Column arrays by group: a numeric dtype name, or 'string' for string-table codes
+        groups = {}
+        columns = []
+        strings = {}
+        for column in df.columns:
+            if pd.api.types.is_numeric_dtype(df[column]):
+                values = df[column].to_numpy()
+                group = values.dtype.name
+            else:
+                codes, uniques = pd.factorize(df[column])
+                values = codes.astype(np.int32)
+                group = 'string'
+                strings[column] = [str(value) for value in uniques]
+            columns.append({'name': column, 'group': group, 'row': len(groups.setdefault(group, []))})
+            groups[group].append(values)
+        
+        for group, arrays in groups.items():
+            np.save(os.path.join(tmp_dir, f'{group}.npy'), np.stack(arrays))
+        with open(os.path.join(tmp_dir, 'columns.json'), 'w', encoding='utf-8') as f:
+            json.dump({'columns': columns, 'strings': strings}, f)
+        
+        os.replace(tmp_dir, cache_dir)
+    except OSError:
+        # Another process may have finished the same cache first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(cache_dir):
+            raise
+    return cache_dir
+
+def _load_cache(cache_dir):
+    """Build the DataFrame from a compiled cache, memory-mapping numeric columns."""
+    with open(os.path.join(cache_dir, 'columns.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    
+    groups = {}
+    data = {}
+    for column in meta['columns']:
+        group = column['group']
+        if group not in groups:
+            groups[group] = np.load(os.path.join(cache_dir, f'{group}.npy'), mmap_mode='r')
+        values = groups[group][column['row']]
+        if group == 'string':
+            # Look the codes up in the string table; code -1 is a missing value
+            table = np.array(meta['strings'][column['name']] + [np.nan], dtype=object)
+            values = table[values]
+        data[column['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+def load_pokemon_data(data_path=None):
+    """Load Pokemon data, compiling the binary cache on first use."""
+    # Get the absolute path to the data file
+    data_path = data_path or get_data_path()
+    
+    # Load the data, falling back to the CSV if the cache cannot be written
+    cache_dir = get_cache_dir(data_path)
+    if not os.path.isdir(cache_dir):
+        try:
+            compile_pokemon_cache(data_path)
+        except OSError:
+            return pd.read_csv(data_path)
+    return _load_cache(cache_dir)
+
+# (mtime, size, hash) of each CSV path hashed so far
+_dataset_hashes = {}
+
+def dataset_hash(data_path=None):
+    """Get a short content hash of the Pokemon CSV file, used to key caches.
+
+    The file is only read again when its modification time or size changes.
+    """
+    data_path = os.path.abspath(data_path or get_data_path())
+    stat = os.stat(data_path)
+    cached = _dataset_hashes.get(data_path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        with open(data_path, 'rb') as f:
+            cached = _dataset_hashes[data_path] = (stat.st_mtime_ns, stat.st_size,
+                                                   hashlib.sha256(f.read()).hexdigest()[:16])
+    return cached[2]
+
+def get_type_distribution_data(df):
+    """Precompute the per-generation type counts used by the Type Analysis tab.
+
+    Returns a small JSON-friendly dict: the generations, the sorted type1 and
+    type2 names, and for each generation (in the same order) the type1 counts
+    and the type1 x type2 crosstab as nested lists of ints.
+    """
+    generations = sorted(int(gen) for gen in df['generation'].unique())
+    types1 = sorted(df['type1'].dropna().unique())
+    types2 = sorted(df['type2'].dropna().unique())
+    
+    type1_counts = []
+    crosstabs = []
+    for gen in generations:
+        gen_df = df[df['generation'] == gen]
+        counts = gen_df['type1'].value_counts()
+        type1_counts.append([int(counts.get(t, 0)) for t in types1])
+        crosstab = pd.crosstab(gen_df['type1'], gen_df['type2']).reindex(index=types1, columns=types2, fill_value=0)
+        crosstabs.append(crosstab.to_numpy(dtype=int).tolist())
+    
+    return {
+        'generations': generations,
+        'types1': types1,
+        'types2': types2,
+        'type1_counts': type1_counts,
+        'crosstabs': crosstabs
+    }
+
+class PokemonRecord:
+    """Read-only view of a single Pokemon in a PokemonStore.
+
+    Supports the same item access as a DataFrame row (pokemon['hp']), but
+    only holds a reference to the store and a row position.
+    """
+    __slots__ = ('store', 'position')
+
+    def __init__(self, store: 'PokemonStore', position: int):
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, column: str):
+        return self.store.value(column, self.position)
+
+    def __repr__(self) -> str:
+        return f"PokemonRecord({self.name!r})"
+
+    @property
+    def name(self) -> str:
+        return self.store.names[self.position]
+
+    @property
+    def type1_code(self) -> int:
+        return int(self.store.type1[self.position])
+
+    @property
+    def type2_code(self) -> int:
+        return int(self.store.type2[self.position])
+
+    @property
+    def stats(self) -> np.ndarray:
+        """Base stats in STAT_COLUMNS order."""
+        return self.store.stats[self.position]
+
+class PokemonStore:
+    """Columnar, name-indexed view of the Pokemon dataset.
+
+    Stats are kept in one contiguous int16 array and types as small integer
+    codes from app.utils.type_index, so a lookup by name or pokedex number is
+    a dictionary hit rather than a scan over the DataFrame.
+    """
+
+    def __init__(self, pokemon_df: pd.DataFrame):
+        """Build the store from the raw Pokemon DataFrame."""
+        self.pokemon_df = pokemon_df
+        self.names = pokemon_df['name'].tolist()
+        self.pokedex_numbers = pokemon_df['pokedex_number'].to_numpy(dtype=np.int16)
+        self.stats = np.ascontiguousarray(pokemon_df[STAT_COLUMNS].to_numpy(dtype=np.int16))
+        self.type1 = encode_types(pokemon_df['type1'])
+        self.type2 = encode_types(pokemon_df['type2'])
+
+        self._by_name = {name: i for i, name in enumerate(self.names)}
+        self._by_number = {int(number): i for i, number in enumerate(self.pokedex_numbers)}
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, pokemon_name: str) -> bool:
+        return pokemon_name in self._by_name
+
+    def index_of(self, pokemon_name: str) -> int:
+        """Get the row position of a Pokemon by name."""
+        return self._by_name[pokemon_name]
+
+    def get(self, pokemon_name: str) -> PokemonRecord:
+        """Get a Pokemon by name."""
+        return PokemonRecord(self, self._by_name[pokemon_name])
+
+    def by_number(self, pokedex_number: int) -> PokemonRecord:
+        """Get a Pokemon by pokedex number."""
+        return PokemonRecord(self, self._by_number[pokedex_number])
+
+    def name_for_number(self, pokedex_number: int):
+        """Get the name for a pokedex number, or None if there is no such Pokemon."""
+        position = self._by_number.get(pokedex_number)
+        return self.names[position] if position is not None else None
+
+    def stat(self, stat_name: str) -> np.ndarray:
+        """Get one base stat for every Pokemon."""
+        return self.stats[:, STAT_INDEX[stat_name]]
+
+    def value(self, column: str, position: int):
+        """Get a single column value for the Pokemon at a row position."""
+        if column == 'name':
+            return self.names[position]
+        if column in STAT_INDEX:
+            return int(self.stats[position, STAT_INDEX[column]])
+        if column == 'pokedex_number':
+            return int(self.pokedex_numbers[position])
+        if column in ('type1', 'type2'):
+            code = getattr(self, column)[position]
+            return TYPE_NAMES[code] if code != NO_TYPE else None
+
+        # Any other column is converted to an array once, on first use
+        if column not in self._columns:
+            self._columns[column] = self.pokemon_df[column].to_numpy()
+        return self._columns[column][position]
+
+# Loaded on first access to pokemon_df / pokemon_store
+_pokemon_df = None
+_pokemon_store = None
+
+def get_pokemon_data():
+    """Get the app's Pokemon DataFrame, loading it on first use."""
+    global _pokemon_df
+    if _pokemon_df is None:
+        _pokemon_df = load_pokemon_data()
+    return _pokemon_df
+
+def get_pokemon_store():
+    """Get the app's PokemonStore, building it on first use."""
+    global _pokemon_store
+    if _pokemon_store is None:
+        _pokemon_store = PokemonStore(get_pokemon_data())
+    return _pokemon_store
+
+def __getattr__(name):
+    # Keeps "from app.data.pokemon_data import pokemon_df" working without loading at import
+    if name == 'pokemon_df':
+        return get_pokemon_data()
+    if name == 'pokemon_store':
+        return get_pokemon_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Load the data once when the module is imported
-pokemon_df = load_pokemon_data() 
\ No newline at end of file
+if __name__ == '__main__':
+    # Compile step: python -m app.data.pokemon_data [path/to/pokemon.csv]
+    import sys
+    print(compile_pokemon_cache(sys.argv[1] if len(sys.argv) > 1 else None))
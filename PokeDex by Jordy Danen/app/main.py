@@ -1,16 +1,23 @@
 """Main application module."""
-from dash import Dash, html, dcc, Input, Output
+import os
+import tempfile
+import diskcache
+from dash import Dash, DiskcacheManager, html, dcc, Input, Output
 from app.dashboard import layout as dashboard_layout
 from app.dashboard import callbacks as dashboard_callbacks
 from app.battle import callbacks as battle_callbacks
 
 def create_app():
     """Create and configure the Dash application."""
+    # Background callbacks (battle simulation) run in local worker processes
+    cache = diskcache.Cache(os.path.join(tempfile.gettempdir(), 'pokedex-background-callbacks'))
+    
     app = Dash(
         __name__,
         external_stylesheets=['https://fonts.googleapis.com/css2?family=Press+Start+2P&display=swap'],
         suppress_callback_exceptions=True,
-        assets_folder='../static'
+        assets_folder='../static',
+        background_callback_manager=DiskcacheManager(cache)
     )
     
     # Set the layout directly
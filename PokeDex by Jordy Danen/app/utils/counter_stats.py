@@ -0,0 +1,35 @@
+"""Vectorized calculate_effectiveness for the counter models.
+
+The counter-model notebooks and battle_transformer.py label a pair of Pokemon
+with calculate_effectiveness: the defender's against_* multipliers for each
+of the attacker's types, times the attacker's attack + sp_attack + speed over
+the defender's defense + sp_defense + hp. CounterStats holds those terms for
+a whole roster as arrays, so scoring any batch of pairs is a few gathers.
+"""
+import numpy as np
+from app.utils.type_index import TYPE_NAMES, encode_types
+
+# against_* columns of pokemon.csv in type code order; the CSV writes fighting as 'fight'
+AGAINST_COLUMNS = ['against_' + ('fight' if name == 'fighting' else name) for name in TYPE_NAMES]
+
+class CounterStats:
+    """Per-Pokemon terms of calculate_effectiveness for the rows of a DataFrame.
+
+    against[i, code] is the multiplier row i takes from type code, with an
+    extra neutral column for NONE, so a missing type2 (NaN or 'none')
+    multiplies by 1 without a branch.
+    """
+
+    def __init__(self, df):
+        against = df[AGAINST_COLUMNS].to_numpy(dtype=np.float64)
+        self.against = np.hstack([against, np.ones((len(df), 1))])
+        self.type1_codes = encode_types(df['type1']).astype(np.intp)
+        self.type2_codes = encode_types(df['type2']).astype(np.intp)
+        self.offense = df[['attack', 'sp_attack', 'speed']].sum(axis=1).to_numpy(dtype=np.float64)
+        self.bulk = df[['defense', 'sp_defense', 'hp']].sum(axis=1).to_numpy(dtype=np.float64)
+
+    def effectiveness(self, attackers, defenders) -> np.ndarray:
+        """calculate_effectiveness for arrays of attacker/defender row positions."""
+        type_effectiveness = (self.against[defenders, self.type1_codes[attackers]] *
+                              self.against[defenders, self.type2_codes[attackers]])
+        return type_effectiveness * (self.offense[attackers] / self.bulk[defenders])
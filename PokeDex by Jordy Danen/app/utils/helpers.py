@@ -74,11 +74,11 @@ def get_evolution_chain(df, pokemon_name):
     
     return prev_evolutions, next_evolutions
 
-def get_recommended_moves(df, pokemon_name):
+def get_recommended_moves(store, pokemon_name):
     """Get recommended moves for a Pokemon based on its type(s)."""
-    pokemon = df[df['name'] == pokemon_name].iloc[0]
-    type1 = pokemon['type1'].lower() if 'type1' in df.columns else pokemon['Type 1'].lower()
-    type2 = pokemon['type2'] if 'type2' in df.columns else pokemon['Type 2']
+    pokemon = store.get(pokemon_name)
+    type1 = pokemon['type1'].lower()
+    type2 = pokemon['type2']
     
     recommended_moves = []
     
@@ -0,0 +1,136 @@
+"""Size-bounded LRU cache for matchup results, with an optional SQLite tier.
+
+Used by the battle predictors to memoize results keyed by
+(pokemon1, pokemon2, ability). Every cache has a version string, normally a
+hash of the model and preprocessor files or of the data a heuristic uses.
+On-disk entries written under a different version are dropped when the
+cache is opened, so retraining a model invalidates its stored results.
+"""
+import hashlib
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+def file_version(*paths) -> str:
+    """Get a short content hash over one or more files, e.g. a .pth and a .pkl."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def array_version(*arrays) -> str:
+    """Get a short content hash over one or more arrays, shapes and dtypes included."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+def dataframe_version(df: pd.DataFrame) -> str:
+    """Get a short content hash of a DataFrame."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()[:16]
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional persistent SQLite tier.
+
+    Keys are tuples of plain values such as (pokemon1, pokemon2, ability).
+    The in-memory tier holds at most maxsize entries, evicting the least
+    recently used one. When path is given, every result is also written to
+    a SQLite database there and looked up on an in-memory miss.
+    """
+
+    def __init__(self, maxsize: int = 1024, path: str = None, version: str = ''):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute('CREATE TABLE IF NOT EXISTS results '
+                                 '(key TEXT PRIMARY KEY, version TEXT, value BLOB)')
+                # Results of any other model version are stale
+                self._db.execute('DELETE FROM results WHERE version != ?', (version,))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        # Looks in both tiers like get, without counting a hit or miss
+        with self._lock:
+            if key in self._entries:
+                return True
+            if self._db is not None:
+                return self._db.execute('SELECT 1 FROM results WHERE key = ? AND version = ?',
+                                        (repr(key), self.version)).fetchone() is not None
+            return False
+
+    def get(self, key, default=None):
+        """Get a cached result, or default if it is in neither tier."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT value FROM results WHERE key = ? AND version = ?',
+                                       (repr(key), self.version)).fetchone()
+                if row is not None:
+                    self.hits += 1
+                    value = pickle.loads(row[0])
+                    self._remember(key, value)
+                    return value
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        """Store a result in memory and, if enabled, on disk."""
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                                     (repr(key), self.version, pickle.dumps(value)))
+
+    def get_or_compute(self, key, compute):
+        """Get a cached result, calling compute() and caching it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached result, including the on-disk ones."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute('DELETE FROM results')
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key, value) -> None:
+        """Add to the in-memory tier, evicting the least recently used entry."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,24 @@
+"""Seedable random number streams for the battle simulators.
+
+Everything that rolls dice takes a seed: None for fresh OS entropy, an int
+or SeedSequence for a reproducible stream, or an existing Generator to draw
+from. Parallel workers each get a child of a single SeedSequence, so their
+streams are independent and the whole run is reproducible from one seed.
+"""
+import numpy as np
+
+def make_rng(seed=None) -> np.random.Generator:
+    """Get a Generator for a seed; a Generator is returned unchanged."""
+    return np.random.default_rng(seed)
+
+def spawn_seeds(seed, n: int) -> list:
+    """Split a seed into n independent child SeedSequences, one per worker."""
+    if isinstance(seed, np.random.Generator):
+        return seed.bit_generator.seed_seq.spawn(n)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+def spawn_rngs(seed, n: int) -> list:
+    """Get n independent Generators derived from one seed."""
+    return [make_rng(child) for child in spawn_seeds(seed, n)]
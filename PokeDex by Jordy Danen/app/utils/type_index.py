@@ -0,0 +1,74 @@
+"""Integer type codes and a dense type-effectiveness matrix.
+
+The matrix is built once from TYPE_EFFECTIVENESS when the module is imported.
+Types are numbered alphabetically, which is also the order of the
+``against_*`` columns in pokemon.csv. An extra NONE code stands for an empty
+second type slot and is neutral in both directions, so dual-type lookups
+never need to branch on a missing type.
+"""
+from enum import IntEnum
+import numpy as np
+from app.utils.constants import TYPE_EFFECTIVENESS
+
+class PokemonType(IntEnum):
+    """Integer codes for the 18 Pokemon types."""
+    BUG = 0
+    DARK = 1
+    DRAGON = 2
+    ELECTRIC = 3
+    FAIRY = 4
+    FIGHTING = 5
+    FIRE = 6
+    FLYING = 7
+    GHOST = 8
+    GRASS = 9
+    GROUND = 10
+    ICE = 11
+    NORMAL = 12
+    POISON = 13
+    PSYCHIC = 14
+    ROCK = 15
+    STEEL = 16
+    WATER = 17
+    NONE = 18  # Empty second type slot
+
+NUM_TYPES = 18
+NO_TYPE = PokemonType.NONE
+
+# Lowercase type names in code order, without NONE
+TYPE_NAMES = tuple(t.name.lower() for t in PokemonType if t is not NO_TYPE)
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+def _build_matrix() -> np.ndarray:
+    """Build the (attacker, defender) multiplier matrix, NONE included."""
+    matrix = np.ones((NUM_TYPES + 1, NUM_TYPES + 1))
+    for attack_type, row in TYPE_EFFECTIVENESS.items():
+        for defend_type, multiplier in row.items():
+            matrix[TYPE_CODES[attack_type], TYPE_CODES[defend_type]] = multiplier
+    matrix.setflags(write=False)
+    return matrix
+
+# TYPE_MATRIX[attacker, defender] -> damage multiplier
+TYPE_MATRIX = _build_matrix()
+
+def type_code(type_name) -> int:
+    """Get the code for a type name; missing or unknown types map to NONE."""
+    if not isinstance(type_name, str):
+        return NO_TYPE
+    return TYPE_CODES.get(type_name.lower(), NO_TYPE)
+
+def encode_types(type_names) -> np.ndarray:
+    """Encode a sequence of type names (NaN allowed) as an int8 code array."""
+    return np.array([type_code(name) for name in type_names], dtype=np.int8)
+
+def effectiveness(attack_types, defender_type1, defender_type2=NO_TYPE):
+    """Multiplier of attack type code(s) against a possibly dual-typed defender.
+
+    All arguments may be scalars or broadcastable integer arrays.
+    """
+    return TYPE_MATRIX[attack_types, defender_type1] * TYPE_MATRIX[attack_types, defender_type2]
+
+def dual_effectiveness(attacker_type1, attacker_type2, defender_type1, defender_type2):
+    """Combined multiplier of both attacker types against both defender types."""
+    return (effectiveness(attacker_type1, defender_type1, defender_type2) *
+            effectiveness(attacker_type2, defender_type1, defender_type2))
@@ -0,0 +1,57 @@
+/* Lazy loading for the Pokedex grid sprites.
+ *
+ * Grid images are rendered with a data-src attribute instead of src. They
+ * get their src once they scroll into view, so only sprites that are actually
+ * seen are downloaded. Dash may reuse an <img> for a different Pokemon when a
+ * new page is shown, so a changed data-src is picked up again. */
+(function () {
+    function load(img) {
+        if (img.dataset.src && img.getAttribute('src') !== img.dataset.src) {
+            img.setAttribute('src', img.dataset.src);
+        }
+    }
+
+    var observer = 'IntersectionObserver' in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                load(entry.target);
+                observer.unobserve(entry.target);
+            }
+        });
+    }, {rootMargin: '200px'}) : null;
+
+    function watch(img) {
+        if (observer) {
+            observer.unobserve(img);
+            observer.observe(img);
+        } else {
+            load(img);
+        }
+    }
+
+    function scan(node) {
+        if (node.nodeType !== 1) {
+            return;
+        }
+        if (node.matches('img.lazy-sprite')) {
+            watch(node);
+        }
+        node.querySelectorAll('img.lazy-sprite').forEach(watch);
+    }
+
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes') {
+                mutation.target.removeAttribute('src');
+                watch(mutation.target);
+            } else {
+                mutation.addedNodes.forEach(scan);
+            }
+        });
+    }).observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['data-src']
+    });
+})();
@@ -0,0 +1,84 @@
+/* Clientside callbacks for the Type Analysis tab.
+ *
+ * The per-generation type counts and type1 x type2 crosstabs are computed
+ * once on the server (get_type_distribution_data) and stored in the page, so
+ * toggling a generation only sums a few small arrays in the browser. */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    pokedex: Object.assign({}, (window.dash_clientside || {}).pokedex, {
+        updateTypeAnalysis: function () {
+            // Arguments: one n_clicks per generation, one className per generation, the data
+            var data = arguments[arguments.length - 1];
+            var generations = data.generations;
+            var count = generations.length;
+            var classNames = Array.prototype.slice.call(arguments, count, 2 * count);
+            var triggered = dash_clientside.callback_context.triggered;
+            var clicked = -1;
+
+            // Toggle the clicked button; initialize all generations as active on first load
+            var states;
+            if (!triggered || !triggered.length || triggered[0].prop_id === '.') {
+                states = generations.map(function () { return 'gen-button active'; });
+            } else {
+                var buttonId = triggered[0].prop_id.split('.')[0];
+                clicked = generations.indexOf(parseInt(buttonId.split('-').pop(), 10));
+                states = classNames.map(function (className) {
+                    return className || 'gen-button active';
+                });
+                states[clicked] = states[clicked].indexOf('active') >= 0 ? 'gen-button' : 'gen-button active';
+            }
+
+            // Ensure at least one generation is active
+            var active = [];
+            states.forEach(function (state, i) {
+                if (state.indexOf('active') >= 0) {
+                    active.push(i);
+                }
+            });
+            if (!active.length) {
+                states[clicked] = 'gen-button active';
+                active = [clicked];
+            }
+
+            // Bar chart: one trace of type1 counts per active generation
+            var bars = active.map(function (i) {
+                return {type: 'bar', name: 'Gen ' + generations[i], x: data.types1, y: data.type1_counts[i]};
+            });
+
+            // Heatmap: summed crosstabs, without all-zero rows and columns
+            var totals = data.types1.map(function (_, row) {
+                return data.types2.map(function (_, col) {
+                    return active.reduce(function (sum, i) { return sum + data.crosstabs[i][row][col]; }, 0);
+                });
+            });
+            var rows = [];
+            var cols = [];
+            data.types1.forEach(function (_, row) {
+                if (totals[row].some(function (value) { return value > 0; })) {
+                    rows.push(row);
+                }
+            });
+            data.types2.forEach(function (_, col) {
+                if (totals.some(function (values) { return values[col] > 0; })) {
+                    cols.push(col);
+                }
+            });
+
+            var typeDistFig = {
+                data: bars,
+                layout: {title: 'Type Distribution by Generation', barmode: 'group', template: 'plotly_dark'}
+            };
+            var heatmapFig = {
+                data: [{
+                    type: 'heatmap',
+                    z: rows.map(function (row) { return cols.map(function (col) { return totals[row][col]; }); }),
+                    x: cols.map(function (col) { return data.types2[col]; }),
+                    y: rows.map(function (row) { return data.types1[row]; })
+                }],
+                layout: {title: 'Type Combinations Heatmap', template: 'plotly_dark'}
+            };
+
+            var activeGenerations = '[' + active.map(function (i) { return generations[i]; }).join(', ') + ']';
+            return states.concat([activeGenerations, typeDistFig, heatmapFig]);
+        }
+    })
+});
@@ -0,0 +1,33 @@
+"""Tests for the vectorized calculate_effectiveness of the counter models."""
+import numpy as np
+import pandas as pd
+import pytest
+from app.data.pokemon_data import get_data_path
+from app.utils.counter_stats import CounterStats
+
+def calculate_effectiveness(attacker, defender):
+    """Row-at-a-time reference, as in battle_transformer.py."""
+    type_map = {'fighting': 'fight'}
+    type_effectiveness = defender['against_' + type_map.get(attacker['type1'], attacker['type1'])]
+    if attacker['type2'] != 'none':
+        type_effectiveness *= defender['against_' + type_map.get(attacker['type2'], attacker['type2'])]
+    return type_effectiveness * ((attacker['attack'] + attacker['sp_attack'] + attacker['speed']) /
+                                 (defender['defense'] + defender['sp_defense'] + defender['hp']))
+
+@pytest.fixture(scope='module')
+def roster():
+    df = pd.read_csv(get_data_path())
+    df['type2'] = df['type2'].fillna('none')
+    return df
+
+def test_matches_row_at_a_time(roster):
+    stats = CounterStats(roster)
+    pairs = np.random.default_rng(0).integers(0, len(roster), (500, 2))
+    expected = [calculate_effectiveness(roster.iloc[a], roster.iloc[d]) for a, d in pairs]
+    assert np.allclose(stats.effectiveness(pairs[:, 0], pairs[:, 1]), expected)
+
+def test_missing_type2_as_nan_is_neutral(roster):
+    with_nan = roster.assign(type2=roster['type2'].replace('none', np.nan))
+    positions = np.arange(len(roster))
+    assert np.array_equal(CounterStats(with_nan).effectiveness(positions, positions[::-1]),
+                          CounterStats(roster).effectiveness(positions, positions[::-1]))
@@ -0,0 +1,38 @@
+"""Tests for the exact win-probability solver."""
+import numpy as np
+import pytest
+from app.battle.exact import ExactSolver, first_mover_wins
+from app.battle.simulator import BattleSimulator
+from app.data.pokemon_data import get_pokemon_data, get_pokemon_store
+
+def test_certain_knockout_wins():
+    # The first attack always deals the second Pokemon's 2 HP
+    assert first_mover_wins(np.array([0.0, 0.0, 1.0]), np.array([0.0, 1.0])) == 1.0
+
+def test_coin_flip_attacks():
+    # Both sides have 1 HP and hit half the time: p = 1/2 + 1/4 p, so p = 2/3
+    assert first_mover_wins(np.array([0.5, 0.5]), np.array([0.5, 0.5])) == pytest.approx(2 / 3)
+
+def test_two_hit_race():
+    # Both sides need two hits that always land; the first mover lands its second hit first
+    assert first_mover_wins(np.array([0.0, 1.0, 0.0]), np.array([0.0, 1.0, 0.0])) == pytest.approx(1.0)
+
+@pytest.fixture(scope='module')
+def solver():
+    return ExactSolver(get_pokemon_store())
+
+@pytest.mark.parametrize('pokemon1, pokemon2', [('Pikachu', 'Charmander'), ('Machamp', 'Alakazam'),
+                                                 ('Charmander', 'Pikachu')])
+def test_matches_monte_carlo(solver, pokemon1, pokemon2):
+    exact = solver.win_probability(pokemon1, pokemon2)
+    sampled = BattleSimulator(get_pokemon_data()).simulate_many(pokemon1, pokemon2, 40000, seed=3)
+    assert sampled['draw_probability'] == 0
+    assert abs(exact - sampled['win_probability']) < 5 * np.sqrt(exact * (1 - exact) / 40000)
+
+def test_sides_add_up_to_one(solver):
+    assert (solver.win_probability('Pikachu', 'Charmander') +
+            solver.win_probability('Charmander', 'Pikachu')) == pytest.approx(1.0)
+
+def test_results_are_cached(solver):
+    solver.win_probability('Gyarados', 'Charizard')
+    assert ('Gyarados', 'Charizard') in solver.results
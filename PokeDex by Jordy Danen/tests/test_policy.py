@@ -0,0 +1,45 @@
+"""Tests for the move policies and their matchup tables."""
+import numpy as np
+import pytest
+from app.battle.policy import ExpectimaxPolicy, GreedyPolicy, MatchupTable, make_policy
+from app.battle.simulator import Pokemon
+from app.data.move_data import get_move_table
+from app.data.pokemon_data import get_pokemon_store
+
+def pokemon(name):
+    return Pokemon(get_pokemon_store().get(name))
+
+@pytest.fixture(scope='module')
+def table():
+    return MatchupTable(pokemon('Pikachu'), pokemon('Gyarados'), get_move_table())
+
+def test_damage_distributions_sum_to_one(table):
+    assert np.allclose(table.damage_pmf.sum(axis=1), 1)
+    assert table.random_weights.sum() == pytest.approx(1)
+
+def test_ko_probability_is_the_damage_tail(table):
+    for hp in (0, 1, table.defender_hp // 2, table.defender_hp):
+        assert np.allclose(table.ko_probability[:, hp], table.damage_pmf[:, hp:].sum(axis=1))
+
+def test_greedy_moves_have_the_best_ko_chance(table):
+    rows = table.greedy_moves
+    assert np.allclose(table.ko_probability[rows, np.arange(len(rows))], table.ko_probability.max(axis=0))
+
+def test_policies_pick_moves_of_the_table():
+    attacker, defender = pokemon('Machamp'), pokemon('Alakazam')
+    for policy in (GreedyPolicy(), ExpectimaxPolicy(depth=2)):
+        assert policy.choose_move(attacker, defender) in policy.table(attacker, defender).move_ids
+
+def test_caches_are_bounded():
+    policy = ExpectimaxPolicy(depth=2, cache_size=2, value_cache_size=8)
+    defender = pokemon('Snorlax')
+    for name in ('Pikachu', 'Mew', 'Onix'):
+        policy.choose_move(pokemon(name), defender)
+    assert len(policy._tables) == 2
+    assert len(policy._values) <= 8
+
+def test_make_policy():
+    assert make_policy('random') is None
+    assert isinstance(make_policy('greedy'), GreedyPolicy)
+    with pytest.raises(ValueError):
+        make_policy('minimax')
@@ -0,0 +1,74 @@
+"""Tests for the two-tier ResultCache."""
+import pytest
+from app.utils.result_cache import ResultCache
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache()
+    assert cache.get('a', 'missing') == 'missing'
+    cache.put('a', 1)
+    cache.get('a')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_get_or_compute_calls_compute_once():
+    cache = ResultCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute(('x', 1), lambda: calls.append(1) or 42) == 42
+    assert len(calls) == 1
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
+
+def test_disk_tier_serves_evicted_and_reopened_entries(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(maxsize=1, path=path, version='v1')
+    cache.put(('a',), {'win': 0.25})
+    cache.put(('b',), {'win': 0.75})
+    
+    # ('a',) left memory but is still on disk, for both get and in
+    assert ('a',) in cache
+    assert cache.get(('a',)) == {'win': 0.25}
+    cache.close()
+    
+    reopened = ResultCache(maxsize=1, path=path, version='v1')
+    assert len(reopened) == 0
+    assert ('b',) in reopened
+    assert reopened.get(('b',)) == {'win': 0.75}
+    reopened.close()
+
+def test_contains_does_not_count_hits_or_misses(tmp_path):
+    cache = ResultCache(path=str(tmp_path / 'cache.db'))
+    cache.put('a', 1)
+    assert 'a' in cache and 'z' not in cache
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.close()
+
+def test_other_version_drops_disk_entries(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(path=path, version='v1')
+    cache.put('a', 1)
+    cache.close()
+    
+    retrained = ResultCache(path=path, version='v2')
+    assert 'a' not in retrained
+    assert retrained.get('a') is None
+    retrained.close()
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = ResultCache(path=str(tmp_path / 'cache.db'))
+    cache.put('a', 1)
+    cache.clear()
+    assert 'a' not in cache
+    assert len(cache) == 0
+    cache.close()
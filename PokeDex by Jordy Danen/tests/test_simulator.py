@@ -0,0 +1,41 @@
+"""Tests for the batched simulate_many against the per-battle engine."""
+import numpy as np
+import pytest
+from app.battle.simulator import BattleSimulator
+from app.data.pokemon_data import get_pokemon_data
+
+@pytest.fixture(scope='module')
+def simulator():
+    return BattleSimulator(get_pokemon_data(), seed=0)
+
+def loop_outcomes(simulator, pokemon1, pokemon2, n, max_turns):
+    """(win, draw) fractions of pokemon1 over n battles played one at a time."""
+    winners = [simulator.battle_winner(pokemon1, pokemon2, max_turns, seed=seed) for seed in range(n)]
+    return (np.mean([winner == pokemon1 for winner in winners]),
+            np.mean([winner is None for winner in winners]))
+
+def tolerance(p, n1, n2):
+    """Five standard errors of the difference of two sampled fractions."""
+    return 5 * np.sqrt(max(p * (1 - p), 0.01) * (1 / n1 + 1 / n2))
+
+def test_same_seed_gives_same_result(simulator):
+    first = simulator.simulate_many('Pikachu', 'Charmander', 500, seed=7)
+    second = simulator.simulate_many('Pikachu', 'Charmander', 500, seed=7)
+    assert first['win_probability'] == second['win_probability']
+    assert np.array_equal(first['turn_histogram'], second['turn_histogram'])
+
+@pytest.mark.parametrize('pokemon1, pokemon2', [('Pikachu', 'Charmander'), ('Machamp', 'Alakazam')])
+def test_matches_per_battle_loop(simulator, pokemon1, pokemon2):
+    result = simulator.simulate_many(pokemon1, pokemon2, 4000, seed=1)
+    win, draw = loop_outcomes(simulator, pokemon1, pokemon2, 2000, max_turns=500)
+    assert abs(result['win_probability'] - win) < tolerance(win, 4000, 2000)
+    assert result['draw_probability'] == draw == 0
+
+def test_turn_cap_counts_draws_like_per_battle_loop(simulator):
+    result = simulator.simulate_many('Snorlax', 'Blissey', 4000, seed=2, max_turns=3)
+    win, draw = loop_outcomes(simulator, 'Snorlax', 'Blissey', 2000, max_turns=3)
+    assert result['turn_histogram'].sum() == 4000
+    assert result['turn_histogram'].size <= 4
+    assert result['draw_probability'] > 0
+    assert abs(result['draw_probability'] - draw) < tolerance(draw, 4000, 2000)
+    assert abs(result['win_probability'] - win) < tolerance(win, 4000, 2000)
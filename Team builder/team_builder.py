@@ -1,60 +1,268 @@
 import pandas as pd
 import numpy as np
 from itertools import combinations
+from multiprocessing import Pool
+import heapq
+import os
+import sys
+import time
+
+# Share the type chart with the Pokedex app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PokeDex by Jordy Danen'))
+from app.utils.type_index import NUM_TYPES, TYPE_MATRIX, TYPE_NAMES, encode_types, type_code
+
+STATS = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+
+# Number of set bits for every 18-bit type mask
+POPCOUNT = np.zeros(1 << NUM_TYPES, dtype=np.int64)
+for _bit in range(NUM_TYPES):
+    POPCOUNT += (np.arange(1 << NUM_TYPES) >> _bit) & 1
+
+def _type_masks(condition):
+    """Bitmask per type code (NONE included) of the types where condition holds."""
+    bits = 1 << np.arange(NUM_TYPES)
+    return np.array([int(bits[condition(code)].sum()) for code in range(NUM_TYPES + 1)], dtype=np.int64)
+
+# Per team type: attacking types it is weak to / resists / is immune to,
+# and defending types it hits super effectively. NONE maps to an empty mask.
+WEAK_MASKS = _type_masks(lambda code: (TYPE_MATRIX[:NUM_TYPES, code] == 2) & (code < NUM_TYPES))
+RESIST_MASKS = _type_masks(lambda code: (TYPE_MATRIX[:NUM_TYPES, code] == 0.5) & (code < NUM_TYPES))
+IMMUNE_MASKS = _type_masks(lambda code: (TYPE_MATRIX[:NUM_TYPES, code] == 0) & (code < NUM_TYPES))
+OFFENSE_MASKS = _type_masks(lambda code: (TYPE_MATRIX[code, :NUM_TYPES] == 2) & (code < NUM_TYPES))
+
+def _team_score(weak, resist, immune, offense, stat_sums, size):
+    """evaluate_team score from coverage masks and stat sums (array-friendly)."""
+    averages = stat_sums / size
+    avg_bulk = (averages[..., 0] + averages[..., 2] + averages[..., 4]) / 3
+    
+    # Same terms, in the same order, as evaluate_team
+    score = POPCOUNT[offense] * 2
+    score = score - POPCOUNT[weak]
+    score = score + POPCOUNT[resist] * 0.5
+    score = score + POPCOUNT[immune] * 1.5
+    score = score + (averages[..., 5] + avg_bulk) / 100
+    return score
+
+class TeamEvaluator:
+    """Incremental version of TeamBuilder.evaluate_team for a partial team.
+
+    Keeps the team's coverage bitmasks and stat sums, so every roster
+    Pokemon can be scored as the next member with a few array operations.
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.members = []
+        self.weak = 0
+        self.resist = 0
+        self.immune = 0
+        self.offense = 0
+        self.stat_sums = np.zeros(len(STATS))
+
+    def copy(self):
+        """Get an independent copy of this partial team."""
+        clone = TeamEvaluator(self.builder)
+        clone.members = list(self.members)
+        clone.weak, clone.resist = self.weak, self.resist
+        clone.immune, clone.offense = self.immune, self.offense
+        clone.stat_sums = self.stat_sums.copy()
+        return clone
+
+    def add(self, position):
+        """Add the roster Pokemon at a row position to the team."""
+        b = self.builder
+        self.members.append(position)
+        self.weak |= int(b.weak_masks[position])
+        self.resist |= int(b.resist_masks[position])
+        self.immune |= int(b.immune_masks[position])
+        self.offense |= int(b.offense_masks[position])
+        self.stat_sums += b.stats[position]
+
+    def candidate_scores(self):
+        """evaluate_team score of the team plus each roster Pokemon."""
+        b = self.builder
+        score = _team_score(self.weak | b.weak_masks, self.resist | b.resist_masks,
+                            self.immune | b.immune_masks, self.offense | b.offense_masks,
+                            self.stat_sums + b.stats, len(self.members) + 1)
+        
+        # Pokemon already on the team cannot be picked again
+        score[self.members] = -np.inf
+        return score
+
+class TeamSearch:
+    """Depth-first branch-and-bound search for the top-k teams around a core.
+
+    Candidates are taken in a fixed order and each team is visited once, as
+    an increasing sequence of positions in that order. A branch is pruned
+    when an upper bound on any team below it cannot beat the current k-th
+    best score. The bound uses that coverage only grows by at most the sum
+    of the best single-Pokemon gains, weaknesses never shrink, and the stat
+    term is at most the best remaining stat totals.
+    """
+
+    def __init__(self, builder, core, order, team_size, top_k, seed_teams=(),
+                 deadline=None, node_budget=None):
+        self.core = core
+        self.order = order
+        self.team_size = team_size
+        self.top_k = top_k
+        self.deadline = deadline
+        self.node_budget = node_budget
+        self.nodes = 0
+        self.complete = True
+        
+        # Roster arrays in search order
+        self.weak = builder.weak_masks[order]
+        self.resist = builder.resist_masks[order]
+        self.immune = builder.immune_masks[order]
+        self.offense = builder.offense_masks[order]
+        self.stats = builder.stats[order]
+        
+        # Stat term of a Pokemon, and best sums of k of them from each position on
+        stat_value = self.stats[:, 5] + (self.stats[:, 0] + self.stats[:, 2] + self.stats[:, 4]) / 3
+        self.stat_value = stat_value
+        self.suffix_best = np.zeros((team_size, len(order) + 1))
+        best = []
+        for i in range(len(order) - 1, -1, -1):
+            best = sorted(best + [stat_value[i]], reverse=True)[:team_size]
+            for k in range(1, team_size):
+                self.suffix_best[k, i] = sum(best[:k])
+        
+        self.core_state = (int(builder.weak_masks[core]), int(builder.resist_masks[core]),
+                           int(builder.immune_masks[core]), int(builder.offense_masks[core]),
+                           builder.stats[core].copy())
+        
+        # Min-heap of (score, members) holding the best teams found so far
+        self.heap = []
+        for score, members in seed_teams:
+            self._push(score, tuple(members))
+
+    def threshold(self):
+        """Score a new team has to beat to enter the top k."""
+        return self.heap[0][0] if len(self.heap) >= self.top_k else -np.inf
+
+    def _push(self, score, members):
+        if any(members == team for _, team in self.heap):
+            return
+        if len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, (score, members))
+        elif score > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (score, members))
+
+    def _out_of_budget(self):
+        if self.node_budget is not None and self.nodes >= self.node_budget:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def run(self, branches=None):
+        """Search the subtrees whose first pick is one of branches (default: all)."""
+        self._search_children(0, (), *self.core_state, branches=branches)
+        return self
+
+    def _expand(self, i, path, weak, resist, immune, offense, stat_sums):
+        """Add order position i to the team and search every completion."""
+        self.nodes += 1
+        if self._out_of_budget():
+            self.complete = False
+            return
+        
+        self._search_children(i + 1, path + (i,),
+                              weak | int(self.weak[i]), resist | int(self.resist[i]),
+                              immune | int(self.immune[i]), offense | int(self.offense[i]),
+                              stat_sums + self.stats[i])
+
+    def _search_children(self, start, path, weak, resist, immune, offense, stat_sums, branches=None):
+        """Try every next pick from order position start on."""
+        # Children are the later positions that still leave room for the rest
+        remaining = self.team_size - 1 - len(path)
+        children = np.arange(start, len(self.order) - remaining + 1)
+        if branches is not None:
+            children = np.intersect1d(children, branches)
+        child_weak = weak | self.weak[children]
+        child_resist = resist | self.resist[children]
+        child_immune = immune | self.immune[children]
+        child_offense = offense | self.offense[children]
+        
+        if remaining == 1:
+            # Children are complete teams: score them all at once
+            scores = _team_score(child_weak, child_resist, child_immune, child_offense,
+                                 stat_sums + self.stats[children], self.team_size)
+            self.nodes += len(children)
+            for j in np.flatnonzero(scores > self.threshold()):
+                self._push(float(scores[j]), self._members(path + (int(children[j]),)))
+            return
+        
+        # Best coverage gain any later pick can add on top of this team
+        gains = (POPCOUNT[self.offense[children] & ~offense] * 2 +
+                 POPCOUNT[self.resist[children] & ~resist] * 0.5 +
+                 POPCOUNT[self.immune[children] & ~immune] * 1.5)
+        gain_bound = np.sort(gains)[::-1][:remaining - 1].sum()
+        
+        stat_bound = ((stat_sums[5] + (stat_sums[0] + stat_sums[2] + stat_sums[4]) / 3 +
+                       self.stat_value[children] + self.suffix_best[remaining - 1, children + 1])
+                      / self.team_size / 100)
+        bounds = (POPCOUNT[child_offense] * 2 - POPCOUNT[child_weak] +
+                  POPCOUNT[child_resist] * 0.5 + POPCOUNT[child_immune] * 1.5 +
+                  gain_bound + stat_bound + 1e-9)
+        
+        for j in range(len(children)):
+            if bounds[j] <= self.threshold():
+                continue
+            self._expand(int(children[j]), path, weak, resist, immune, offense, stat_sums)
+            if not self.complete:
+                return
+
+    def _members(self, path):
+        """Team as sorted roster positions, core first."""
+        return (self.core,) + tuple(sorted(int(self.order[p]) for p in path))
+
+# Builder used by branch-and-bound worker processes
+_worker_builder = None
+
+def _init_worker(pokemon_df):
+    global _worker_builder
+    _worker_builder = TeamBuilder(pokemon_df)
+
+def _search_branches(args):
+    """Run a TeamSearch over a share of the top-level branches in a worker."""
+    core, order, team_size, top_k, seed_teams, branches, deadline, node_budget = args
+    search = TeamSearch(_worker_builder, core, order, team_size, top_k, seed_teams,
+                        deadline, node_budget).run(branches)
+    return search.heap, search.nodes, search.complete
 
 class TeamBuilder:
     def __init__(self, pokemon_df):
         self.pokemon_df = pokemon_df
-        self.type_chart = {
-            'normal': {'rock': 0.5, 'ghost': 0, 'steel': 0.5},
-            'fire': {'fire': 0.5, 'water': 0.5, 'grass': 2, 'ice': 2, 'bug': 2, 'rock': 0.5, 'dragon': 0.5, 'steel': 2},
-            'water': {'fire': 2, 'water': 0.5, 'grass': 0.5, 'ground': 2, 'rock': 2, 'dragon': 0.5},
-            'electric': {'water': 2, 'electric': 0.5, 'grass': 0.5, 'ground': 0, 'flying': 2, 'dragon': 0.5},
-            'grass': {'fire': 0.5, 'water': 2, 'grass': 0.5, 'poison': 0.5, 'ground': 2, 'flying': 0.5, 'bug': 0.5, 'rock': 2, 'dragon': 0.5, 'steel': 0.5},
-            'ice': {'fire': 0.5, 'water': 0.5, 'grass': 2, 'ice': 0.5, 'ground': 2, 'flying': 2, 'dragon': 2, 'steel': 0.5},
-            'fighting': {'normal': 2, 'ice': 2, 'poison': 0.5, 'flying': 0.5, 'psychic': 0.5, 'bug': 0.5, 'rock': 2, 'ghost': 0, 'dark': 2, 'steel': 2},
-            'poison': {'grass': 2, 'poison': 0.5, 'ground': 0.5, 'rock': 0.5, 'ghost': 0.5, 'steel': 0},
-            'ground': {'fire': 2, 'electric': 2, 'grass': 0.5, 'poison': 2, 'flying': 0, 'bug': 0.5, 'rock': 2, 'steel': 2},
-            'flying': {'electric': 0.5, 'grass': 2, 'fighting': 2, 'bug': 2, 'rock': 0.5, 'steel': 0.5},
-            'psychic': {'fighting': 2, 'poison': 2, 'psychic': 0.5, 'dark': 0, 'steel': 0.5},
-            'bug': {'fire': 0.5, 'grass': 2, 'fighting': 0.5, 'poison': 0.5, 'flying': 0.5, 'psychic': 2, 'ghost': 0.5, 'dark': 2, 'steel': 0.5},
-            'rock': {'fire': 2, 'ice': 2, 'fighting': 0.5, 'ground': 0.5, 'flying': 2, 'bug': 2, 'steel': 0.5},
-            'ghost': {'normal': 0, 'psychic': 2, 'ghost': 2, 'dark': 0.5},
-            'dragon': {'dragon': 2, 'steel': 0.5},
-            'dark': {'fighting': 0.5, 'psychic': 2, 'ghost': 2, 'dark': 0.5},
-            'steel': {'fire': 0.5, 'water': 0.5, 'electric': 0.5, 'ice': 2, 'rock': 2, 'steel': 0.5}
-        }
+        
+        # Per-Pokemon coverage bitmasks and stats for incremental scoring
+        self.names = {name: i for i, name in enumerate(pokemon_df['name'])}
+        type1 = encode_types(pokemon_df['type1'])
+        type2 = encode_types(pokemon_df['type2'])
+        self.weak_masks = WEAK_MASKS[type1] | WEAK_MASKS[type2]
+        self.resist_masks = RESIST_MASKS[type1] | RESIST_MASKS[type2]
+        self.immune_masks = IMMUNE_MASKS[type1] | IMMUNE_MASKS[type2]
+        self.offense_masks = OFFENSE_MASKS[type1] | OFFENSE_MASKS[type2]
+        self.stats = pokemon_df[STATS].to_numpy(dtype=np.float64)
 
     def calculate_defensive_coverage(self, types):
         """Calculate defensive coverage for a set of types"""
-        weaknesses = set()
-        resistances = set()
-        immunities = set()
+        codes = [type_code(t) for t in types if pd.notna(t)]
         
-        for def_type in types:
-            if pd.isna(def_type):
-                continue
-            for atk_type, effectiveness in self.type_chart.items():
-                multiplier = effectiveness.get(def_type, 1.0)
-                if multiplier == 2:
-                    weaknesses.add(atk_type)
-                elif multiplier == 0.5:
-                    resistances.add(atk_type)
-                elif multiplier == 0:
-                    immunities.add(atk_type)
+        # One row per attacking type, one column per team type
+        multipliers = TYPE_MATRIX[:NUM_TYPES, codes]
+        weaknesses = {TYPE_NAMES[i] for i in np.flatnonzero((multipliers == 2).any(axis=1))}
+        resistances = {TYPE_NAMES[i] for i in np.flatnonzero((multipliers == 0.5).any(axis=1))}
+        immunities = {TYPE_NAMES[i] for i in np.flatnonzero((multipliers == 0).any(axis=1))}
         
         return weaknesses, resistances, immunities
 
     def calculate_offensive_coverage(self, types):
         """Calculate offensive coverage (super effective hits)"""
-        coverage = set()
-        for atk_type in types:
-            if pd.isna(atk_type):
-                continue
-            for def_type, effectiveness in self.type_chart.items():
-                if effectiveness.get(atk_type, 1.0) == 2:
-                    coverage.add(def_type)
-        return coverage
+        codes = [type_code(t) for t in types if pd.notna(t)]
+        
+        # One row per team type, one column per defending type
+        multipliers = TYPE_MATRIX[codes, :NUM_TYPES]
+        return {TYPE_NAMES[i] for i in np.flatnonzero((multipliers == 2).any(axis=0))}
 
     def calculate_team_stats(self, team):
         """Calculate average and standard deviation of team stats"""
@@ -101,29 +309,106 @@ class TeamBuilder:
 
     def build_team(self, core_pokemon_name, team_size=6):
         """Build optimal team around a core Pokemon"""
-        # Get core Pokemon
-        core_pokemon = self.pokemon_df[self.pokemon_df['name'] == core_pokemon_name].iloc[0]
-        team = [core_pokemon]
+        # Start from the core Pokemon
+        evaluator = TeamEvaluator(self)
+        evaluator.add(self.names[core_pokemon_name])
         
-        remaining_pokemon = self.pokemon_df[self.pokemon_df['name'] != core_pokemon_name]
+        # Greedily add the best scoring Pokemon, one roster-wide pass per slot
+        while len(evaluator.members) < min(team_size, len(self.pokemon_df)):
+            evaluator.add(int(np.argmax(evaluator.candidate_scores())))
         
-        while len(team) < team_size:
-            best_score = -float('inf')
-            best_pokemon = None
+        return [self.pokemon_df.iloc[position] for position in evaluator.members]
+
+    def beam_search(self, core_pokemon_name, team_size=6, beam_width=32):
+        """Build teams around a core Pokemon, keeping the best beam_width partial teams per slot.
+
+        Returns (score, roster positions) for the final beam, best first. A beam
+        width of 1 gives the same team as build_team.
+        """
+        start = TeamEvaluator(self)
+        start.add(self.names[core_pokemon_name])
+        beam = [(None, start)]
+        
+        for _ in range(min(team_size, len(self.pokemon_df)) - 1):
+            # Best extensions of every team in the beam, each team counted once
+            extensions = {}
+            for _, evaluator in beam:
+                scores = evaluator.candidate_scores()
+                width = min(beam_width, len(scores) - len(evaluator.members))
+                for position in np.argpartition(-scores, width - 1)[:width]:
+                    key = frozenset(evaluator.members + [int(position)])
+                    if key not in extensions or scores[position] > extensions[key][0]:
+                        extensions[key] = (float(scores[position]), evaluator, int(position))
             
-            for _, candidate in remaining_pokemon.iterrows():
-                test_team = team + [candidate]
-                score, *_ = self.evaluate_team(test_team)
-                
-                if score > best_score:
-                    best_score = score
-                    best_pokemon = candidate
+            beam = []
+            for score, evaluator, position in heapq.nlargest(beam_width, extensions.values(),
+                                                             key=lambda e: e[0]):
+                extended = evaluator.copy()
+                extended.add(position)
+                beam.append((score, extended))
+        
+        return [(score, evaluator.members) for score, evaluator in beam]
+
+    def optimize_team(self, core_pokemon_name, team_size=6, top_k=5, beam_width=32,
+                      exact=False, workers=None, time_budget=None, node_budget=None):
+        """Find the top_k teams around a core Pokemon.
+
+        Runs a beam search, then with exact=True a branch-and-bound search
+        seeded with the beam's teams. The branch-and-bound stops early when
+        time_budget (seconds) or node_budget (partial teams visited) runs out,
+        keeping the best teams found so far. With workers > 1 the top-level
+        branches are split over that many processes, capped at the CPU count,
+        so a single-core machine searches in this process.
+
+        Returns a dict with 'teams' (list of (score, team) pairs, best first,
+        each team a list of rows like build_team), 'nodes' and 'complete'
+        (False when a budget cut the exact search short).
+        """
+        start_time = time.perf_counter()
+        core = self.names[core_pokemon_name]
+        team_size = min(team_size, len(self.pokemon_df))
+        found = self.beam_search(core_pokemon_name, team_size, max(beam_width, top_k))
+        seed_teams = [(score, (core,) + tuple(sorted(members[1:]))) for score, members in found]
+        nodes, complete = 0, True
+        
+        if exact and team_size > 1:
+            # Visit the most promising partners first so good teams are found early
+            first_scores = TeamEvaluator(self)
+            first_scores.add(core)
+            scores = first_scores.candidate_scores()
+            order = np.argsort(-scores, kind='stable')[:len(scores) - 1]
             
-            if best_pokemon is not None:
-                team.append(best_pokemon)
-                remaining_pokemon = remaining_pokemon[remaining_pokemon['name'] != best_pokemon['name']]
+            deadline = start_time + time_budget if time_budget is not None else None
+            workers = min(workers or 1, os.cpu_count() or 1)
+            if workers > 1:
+                # Interleave branches so every worker gets a mix of strong and weak ones
+                n_branches = len(order) - team_size + 2
+                budget = node_budget // workers if node_budget is not None else None
+                jobs = [(core, order, team_size, top_k, seed_teams, np.arange(w, n_branches, workers),
+                         deadline, budget) for w in range(workers)]
+                with Pool(workers, initializer=_init_worker, initargs=(self.pokemon_df,)) as pool:
+                    results = pool.map(_search_branches, jobs)
+                for heap, worker_nodes, worker_complete in results:
+                    seed_teams.extend(heap)
+                    nodes += worker_nodes
+                    complete = complete and worker_complete
+            else:
+                search = TeamSearch(self, core, order, team_size, top_k, seed_teams,
+                                    deadline, node_budget).run()
+                seed_teams.extend(search.heap)
+                nodes, complete = search.nodes, search.complete
+        
+        # Merge, drop duplicate teams and keep the best top_k
+        best = {}
+        for score, members in seed_teams:
+            best[members] = max(score, best.get(members, -np.inf))
+        ranked = sorted(best.items(), key=lambda item: -item[1])[:top_k]
         
-        return team
+        return {
+            'teams': [(score, [self.pokemon_df.iloc[p] for p in members]) for members, score in ranked],
+            'nodes': nodes,
+            'complete': complete
+        }
 
     def print_team_analysis(self, team):
         """Print detailed team analysis"""
@@ -147,17 +432,39 @@ class TeamBuilder:
             print(f"{stat.upper()}: {value:.1f}")
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Build and optimize a team around a core Pokemon.")
+    parser.add_argument('core', nargs='?', default='Snivy', help="core Pokemon")
+    parser.add_argument('--top-k', type=int, default=3, help="teams to list")
+    parser.add_argument('--exact', type=float, metavar='SECONDS',
+                        help="also run the branch-and-bound search for up to this many seconds")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes for the exact search (default: 1, capped at the CPU count)")
+    args = parser.parse_args()
+    
     # Read Pokemon data
     pokemon_df = pd.read_csv('../pokemon.csv')
     
     # Create team builder
     builder = TeamBuilder(pokemon_df)
     
-    core_pokemon = "Snivy"
+    core_pokemon = args.core
     team = builder.build_team(core_pokemon)
     
     # Print team analysis
     builder.print_team_analysis(team)
+    
+    # Look past the greedy choice for the best scoring teams; the beam search
+    # takes moments, the exact search only runs when asked for
+    result = builder.optimize_team(core_pokemon, top_k=args.top_k, exact=args.exact is not None,
+                                   workers=args.workers, time_budget=args.exact)
+    if args.exact is None:
+        label = 'beam search'
+    else:
+        label = 'exhaustive' if result['complete'] else 'best found in time budget'
+    print(f"\nTop Teams ({label}):")
+    for score, top_team in result['teams']:
+        print(f"{score:.2f}: {', '.join(pokemon['name'] for pokemon in top_team)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,74 @@
+"""Tests for the team builder's incremental scoring and search."""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from team_builder import TeamBuilder, TeamEvaluator
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pokemon.csv')
+
+@pytest.fixture(scope='module')
+def builder():
+    return TeamBuilder(pd.read_csv(DATA_PATH))
+
+def full_score(builder, positions):
+    return builder.evaluate_team([builder.pokemon_df.iloc[p] for p in positions])[0]
+
+def test_candidate_scores_match_evaluate_team(builder):
+    rng = np.random.default_rng(0)
+    for size in range(1, 6):
+        members = rng.choice(len(builder.pokemon_df), size, replace=False).tolist()
+        evaluator = TeamEvaluator(builder)
+        for position in members:
+            evaluator.add(position)
+        scores = evaluator.candidate_scores()
+        
+        assert np.isneginf(scores[members]).all()
+        for candidate in rng.choice(np.setdiff1d(np.arange(len(scores)), members), 20, replace=False):
+            assert scores[candidate] == pytest.approx(full_score(builder, members + [int(candidate)]))
+
+def test_copy_is_independent(builder):
+    evaluator = TeamEvaluator(builder)
+    evaluator.add(0)
+    clone = evaluator.copy()
+    clone.add(1)
+    assert evaluator.members == [0]
+    assert evaluator.candidate_scores()[1] == pytest.approx(full_score(builder, [0, 1]))
+
+def test_build_team_adds_the_best_member_each_step(builder):
+    team = builder.build_team('Snivy')
+    positions = [builder.names[pokemon['name']] for pokemon in team]
+    assert positions[0] == builder.names['Snivy'] and len(set(positions)) == 6
+    for size in range(1, 6):
+        best = max(full_score(builder, positions[:size] + [p])
+                   for p in range(len(builder.pokemon_df)) if p not in positions[:size])
+        assert full_score(builder, positions[:size + 1]) == pytest.approx(best)
+
+def test_beam_width_one_is_build_team(builder):
+    [(_, members)] = builder.beam_search('Snivy', beam_width=1)
+    assert members == [builder.names[pokemon['name']] for pokemon in builder.build_team('Snivy')]
+
+@pytest.fixture(scope='module')
+def small_builder():
+    return TeamBuilder(pd.read_csv(DATA_PATH).head(25))
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_exact_search_finds_brute_force_top_teams(small_builder, workers):
+    from itertools import combinations
+    core = small_builder.names['Bulbasaur']
+    others = [p for p in range(len(small_builder.pokemon_df)) if p != core]
+    best = sorted((full_score(small_builder, [core] + list(rest)) for rest in combinations(others, 3)),
+                  reverse=True)[:5]
+    
+    result = small_builder.optimize_team('Bulbasaur', team_size=4, top_k=5, beam_width=2,
+                                         exact=True, workers=workers)
+    assert result['complete']
+    assert [score for score, _ in result['teams']] == pytest.approx(best)
+    for score, team in result['teams']:
+        assert team[0]['name'] == 'Bulbasaur'
+        assert small_builder.evaluate_team(team)[0] == pytest.approx(score)
+
+def test_node_budget_stops_search_early(small_builder):
+    result = small_builder.optimize_team('Bulbasaur', team_size=4, exact=True, node_budget=10)
+    assert not result['complete']
+    assert result['teams']
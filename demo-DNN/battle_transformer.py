@@ -9,6 +9,12 @@ import kagglehub
 import ast
 import pickle
 import warnings
+import os
+import sys
+
+# Share the vectorized counter effectiveness with the Pokedex app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PokeDex by Jordy Danen'))
+from app.utils.counter_stats import CounterStats
 
 warnings.filterwarnings('ignore')
 
@@ -183,6 +189,65 @@ class PokemonDataset(Dataset):
         
         return type1_ids, type2_ids, ability_ids, stats, target
 
+class PokemonTensorDataset:
+    """Batch-at-a-time version of PokemonDataset built on pre-encoded tensors.
+    
+    Types, abilities and scaled stats are converted to tensors once, and the
+    terms of calculate_effectiveness are kept in a CounterStats. Every pass
+    over the dataset draws fresh random opponents and computes inputs and
+    labels with array gathers for a whole batch, yielding
+    the same (type1_ids, type2_ids, ability_ids, stats, target) batches as a
+    DataLoader over PokemonDataset.
+    """
+    def __init__(self, df_processed, batch_size=32, shuffle=True):
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.scaler = StandardScaler()
+        
+        numerical_cols = ['attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'hp',
+                         'against_bug', 'against_dark', 'against_dragon', 'against_electric',
+                         'against_fairy', 'against_fight', 'against_fire', 'against_flying',
+                         'against_ghost', 'against_grass', 'against_ground', 'against_ice',
+                         'against_normal', 'against_poison', 'against_psychic', 'against_rock',
+                         'against_steel', 'against_water']
+        
+        self.n_pokemon = len(df_processed)
+        self.stats = torch.as_tensor(self.scaler.fit_transform(df_processed[numerical_cols]),
+                                     dtype=torch.float32)
+        self.type1_ids = torch.as_tensor(df_processed['type1_encoded'].to_numpy(), dtype=torch.long)
+        self.type2_ids = torch.as_tensor(df_processed['type2_encoded'].to_numpy(), dtype=torch.long)
+        self.ability_ids = torch.as_tensor(df_processed['ability_encoded'].to_numpy(), dtype=torch.long)
+        self.counter_stats = CounterStats(df_processed)
+        
+    def __len__(self):
+        # Number of batches per pass, like len(DataLoader)
+        return -(-self.n_pokemon * 5 // self.batch_size)
+        
+    def effectiveness(self, attackers, defenders):
+        """Vectorized calculate_effectiveness for index tensors."""
+        return torch.as_tensor(self.counter_stats.effectiveness(attackers.numpy(), defenders.numpy()))
+        
+    def __iter__(self):
+        n_samples = self.n_pokemon * 5
+        order = torch.randperm(n_samples) if self.shuffle else torch.arange(n_samples)
+        first = order % self.n_pokemon
+        second = torch.randint(0, self.n_pokemon, (n_samples,))
+        
+        for start in range(0, n_samples, self.batch_size):
+            idx1 = first[start:start + self.batch_size]
+            idx2 = second[start:start + self.batch_size]
+            
+            effectiveness1 = self.effectiveness(idx1, idx2)
+            effectiveness2 = self.effectiveness(idx2, idx1)
+            
+            type1_ids = torch.stack([self.type1_ids[idx1], self.type1_ids[idx2]], dim=1)
+            type2_ids = torch.stack([self.type2_ids[idx1], self.type2_ids[idx2]], dim=1)
+            ability_ids = torch.stack([self.ability_ids[idx1], self.ability_ids[idx2]], dim=1)
+            stats = torch.cat([self.stats[idx1], self.stats[idx2]], dim=1)
+            target = (effectiveness1 > effectiveness2).float().unsqueeze(1)
+            
+            yield type1_ids, type2_ids, ability_ids, stats, target
+
 def train_model(model, train_loader, num_epochs=10, learning_rate=0.001):
     criterion = nn.BCELoss()
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
@@ -247,9 +312,9 @@ def main():
     # Preprocess data
     df_processed, n_types, n_abilities = preprocess_data(df)
     
-    # Create dataset
-    dataset = PokemonDataset(df_processed)
-    train_loader = DataLoader(dataset, batch_size=32, shuffle=True)
+    # Create dataset; it yields shuffled batches itself, so no DataLoader is needed
+    dataset = PokemonTensorDataset(df_processed, batch_size=32, shuffle=True)
+    train_loader = dataset
     
     # Initialize models
     type_transformer = PokemonTypeTransformer(n_types=n_types, n_abilities=n_abilities)
@@ -27,4 +27,9 @@ blastoise = pokemon_data[pokemon_data['name'] == 'Blastoise'].iloc[0].to_dict()
 
 probability, result = predictor.predict_battle(charizard, blastoise)
 print(result)
-print(probability)
\ No newline at end of file
+print(probability)
+
+# Rank the whole roster as counters to Charizard in one batched pass
+predictor.set_roster(pokemon_data)
+for name, win_probability in predictor.predict_one_vs_all('Charizard')[:5]:
+    print(f"{name}: {win_probability*100:.1f}%")
\ No newline at end of file
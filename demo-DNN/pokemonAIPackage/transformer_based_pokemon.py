@@ -1,18 +1,40 @@
 import torch
 import pandas as pd
 import pickle
+import ast
 import numpy as np
+import os
+import sys
 from typing import Dict, Tuple, Union, List
 
+# Share the result cache with the Pokedex app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'PokeDex by Jordy Danen'))
+from app.utils.result_cache import ResultCache, file_version
+
+# Numerical model inputs, in the order the scaler was fitted on
+NUMERICAL_COLUMNS = ['attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'hp',
+                     'against_bug', 'against_dark', 'against_dragon', 'against_electric',
+                     'against_fairy', 'against_fight', 'against_fire', 'against_flying',
+                     'against_ghost', 'against_grass', 'against_ground', 'against_ice',
+                     'against_normal', 'against_poison', 'against_psychic', 'against_rock',
+                     'against_steel', 'against_water']
+
 class PokemonBattlePredictor:
     def __init__(self, model_path: str = 'battle_predictor.pth', 
-                 preprocessor_path: str = 'battle_predictor_preprocessors.pkl'):
+                 preprocessor_path: str = 'battle_predictor_preprocessors.pkl',
+                 roster: pd.DataFrame = None, cache_size: int = 1024,
+                 cache_path: str = None):
         """
         Initialize the Pokemon Battle Predictor with trained model and preprocessors.
         
         Args:
             model_path: Path to the saved model weights
             preprocessor_path: Path to the saved preprocessors
+            roster: Optional Pokemon DataFrame to pre-encode for batched prediction
+            cache_size: Number of predict_battle results kept in memory
+            cache_path: Optional SQLite file to persist predict_battle results in.
+                Results are versioned by the model and preprocessor files, so
+                they are dropped when either changes.
         """
         # Load preprocessors
         with open(preprocessor_path, 'rb') as f:
@@ -33,6 +55,12 @@ class PokemonBattlePredictor:
         self.model.load_state_dict(torch.load(model_path))
         self.model.eval()
 
+        self.cache = ResultCache(cache_size, cache_path, version=file_version(model_path, preprocessor_path))
+
+        self.roster_names = None
+        if roster is not None:
+            self.set_roster(roster)
+
     def prepare_pokemon_data(self, pokemon_data: Dict) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         Prepare pokemon data for model input.
@@ -82,6 +110,16 @@ class PokemonBattlePredictor:
                 - Probability of pokemon1 winning (float between 0 and 1)
                 - String description of the prediction
         """
+        key = (pokemon1['name'], pokemon2['name'], (pokemon1['ability'], pokemon2['ability']))
+        win_probability = self.cache.get_or_compute(key, lambda: self._predict_probability(pokemon1, pokemon2))
+
+        # Create result message
+        result_msg = f"{pokemon1['name']} has a {win_probability*100:.1f}% chance of winning against {pokemon2['name']}"
+        
+        return win_probability, result_msg
+
+    def _predict_probability(self, pokemon1: Dict, pokemon2: Dict) -> float:
+        """Run the model on a single pair, without the cache."""
         # Prepare data for both pokemon
         type1_1, type2_1, ability_1, stats_1 = self.prepare_pokemon_data(pokemon1)
         type1_2, type2_2, ability_2, stats_2 = self.prepare_pokemon_data(pokemon2)
@@ -95,12 +133,87 @@ class PokemonBattlePredictor:
         # Make prediction
         with torch.no_grad():
             prediction = self.model(type1_ids, type2_ids, ability_ids, stats)
-            win_probability = prediction.item()
+            return prediction.item()
 
-        # Create result message
-        result_msg = f"{pokemon1['name']} has a {win_probability*100:.1f}% chance of winning against {pokemon2['name']}"
+    def set_roster(self, roster: pd.DataFrame) -> None:
+        """
+        Encode a roster of Pokemon into tensors once, for batched prediction.
         
-        return win_probability, result_msg
+        Args:
+            roster: DataFrame in the pokemon.csv format, one row per Pokemon. If it
+                has an 'ability' column that ability is used, otherwise the first
+                entry of 'abilities'.
+        """
+        if 'ability' in roster.columns:
+            abilities = roster['ability']
+        else:
+            abilities = roster['abilities'].apply(lambda a: ast.literal_eval(a)[0])
+
+        self.roster_names = roster['name'].tolist()
+        self.roster_index = {name: i for i, name in enumerate(self.roster_names)}
+        self.roster_type1 = torch.as_tensor(self.type_encoder.transform(roster['type1']))
+        self.roster_type2 = torch.as_tensor(self.type_encoder.transform(roster['type2'].fillna('none')))
+        self.roster_ability = torch.as_tensor(self.ability_encoder.transform(abilities))
+        self.roster_stats = torch.as_tensor(
+            self.scaler.transform(roster[NUMERICAL_COLUMNS]), dtype=torch.float32
+        )
+
+    def predict_batch(self, pairs: List[Tuple[str, str]], batch_size: int = 4096) -> np.ndarray:
+        """
+        Predict many battles between roster Pokemon at once.
+        
+        Args:
+            pairs: (pokemon1 name, pokemon2 name) tuples; both must be in the roster
+            batch_size: Number of pairs per forward pass
+            
+        Returns:
+            Array with the probability of pokemon1 winning for each pair
+        """
+        if self.roster_names is None:
+            raise ValueError("No roster set; call set_roster() first")
+
+        first = torch.tensor([self.roster_index[p1] for p1, _ in pairs], dtype=torch.long)
+        second = torch.tensor([self.roster_index[p2] for _, p2 in pairs], dtype=torch.long)
+        return self._predict_indices(first, second, batch_size)
+
+    def predict_one_vs_all(self, pokemon: str, batch_size: int = 4096) -> List[Tuple[str, float]]:
+        """
+        Rank every roster Pokemon by its chance of beating the given Pokemon.
+        
+        Args:
+            pokemon: Name of the Pokemon to find counters for
+            batch_size: Number of pairs per forward pass
+            
+        Returns:
+            (name, win probability) tuples, best counter first
+        """
+        if self.roster_names is None:
+            raise ValueError("No roster set; call set_roster() first")
+
+        target = self.roster_index[pokemon]
+        challengers = torch.tensor([i for i in range(len(self.roster_names)) if i != target],
+                                   dtype=torch.long)
+        targets = torch.full_like(challengers, target)
+        win_probabilities = self._predict_indices(challengers, targets, batch_size)
+
+        order = np.argsort(-win_probabilities, kind='stable')
+        return [(self.roster_names[challengers[i]], float(win_probabilities[i])) for i in order]
+
+    def _predict_indices(self, first: torch.Tensor, second: torch.Tensor, batch_size: int) -> np.ndarray:
+        """Run the model on roster index pairs by gathering the cached tensors."""
+        predictions = []
+        with torch.inference_mode():
+            for start in range(0, len(first), batch_size):
+                i = first[start:start + batch_size]
+                j = second[start:start + batch_size]
+                type1_ids = torch.stack([self.roster_type1[i], self.roster_type1[j]], dim=1)
+                type2_ids = torch.stack([self.roster_type2[i], self.roster_type2[j]], dim=1)
+                ability_ids = torch.stack([self.roster_ability[i], self.roster_ability[j]], dim=1)
+                stats = torch.cat([self.roster_stats[i], self.roster_stats[j]], dim=1)
+                predictions.append(self.model(type1_ids, type2_ids, ability_ids, stats).squeeze(1))
+        if not predictions:
+            return np.empty(0, dtype=np.float32)
+        return torch.cat(predictions).numpy()
 
     def get_valid_types(self) -> List[str]:
         """Return list of valid Pokemon types."""
@@ -0,0 +1,119 @@
+"""Vectorized training data and predictions for the RandomForest counter model.
+
+The notebook builds one feature row per Pokemon pair (attacker features
+followed by defender features) and labels it 1 when the first Pokemon is the
+better counter according to calculate_effectiveness. The functions here do
+the same for a whole array of index pairs at once, reading from arrays that
+are extracted from df_exploded a single time.
+"""
+import os
+import sys
+import numpy as np
+
+# Share the vectorized calculate_effectiveness with the Pokedex app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PokeDex by Jordy Danen'))
+from app.utils.counter_stats import CounterStats
+
+FEATURE_COLUMNS = [
+    'type1_encoded', 'type2_encoded', 'ability_encoded',
+    'against_bug', 'against_dark', 'against_dragon',
+    'against_electric', 'against_fairy', 'against_fight', 'against_fire',
+    'against_flying', 'against_ghost', 'against_grass', 'against_ground',
+    'against_ice', 'against_normal', 'against_poison', 'against_psychic',
+    'against_rock', 'against_steel', 'against_water',
+    'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'hp',
+    'height_m', 'weight_kg', 'is_legendary'
+]
+
+class RosterArrays(CounterStats):
+    """Per-Pokemon arrays needed to build pair features and labels.
+
+    The calculate_effectiveness terms and effectiveness() come from CounterStats.
+    """
+
+    def __init__(self, df_exploded):
+        super().__init__(df_exploded)
+        self.features = df_exploded[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+
+        # First row of each Pokemon, keyed by name_encoded
+        codes, first_rows = np.unique(df_exploded['name_encoded'].to_numpy(), return_index=True)
+        self.first_row = dict(zip(codes.tolist(), first_rows.tolist()))
+
+    def __len__(self):
+        return len(self.features)
+
+    def pair_features(self, first, second):
+        """Feature rows for (first[i], second[i]) pairs."""
+        return np.hstack([self.features[first], self.features[second]])
+
+    def pair_labels(self, first, second):
+        """1 where the first Pokemon is the better counter, else 0."""
+        return (self.effectiveness(first, second) > self.effectiveness(second, first)).astype(np.int64)
+
+def iter_pair_chunks(roster, pairs_indices, chunk_size=100_000):
+    """Yield (X, y) chunks for an (n_pairs, 2) array of row positions.
+
+    Only one chunk of features is held in memory at a time, so this scales to
+    millions of pairs.
+    """
+    pairs_indices = np.asarray(pairs_indices)
+    for start in range(0, len(pairs_indices), chunk_size):
+        chunk = pairs_indices[start:start + chunk_size]
+        first, second = chunk[:, 0], chunk[:, 1]
+        yield roster.pair_features(first, second), roster.pair_labels(first, second)
+
+def build_training_data(df_exploded, pairs_indices, chunk_size=100_000):
+    """Build the full feature matrix and label vector for the given pairs.
+
+    Equivalent to the notebook's per-pair loop, but filled chunk by chunk
+    into preallocated float32 arrays.
+    """
+    roster = RosterArrays(df_exploded)
+    n_pairs = len(pairs_indices)
+    X = np.empty((n_pairs, 2 * len(FEATURE_COLUMNS)), dtype=np.float32)
+    y = np.empty(n_pairs, dtype=np.int64)
+
+    start = 0
+    for X_chunk, y_chunk in iter_pair_chunks(roster, pairs_indices, chunk_size):
+        X[start:start + len(X_chunk)] = X_chunk
+        y[start:start + len(y_chunk)] = y_chunk
+        start += len(X_chunk)
+    return X, y
+
+# Encoded roster of the DataFrame predict_counter was last called with
+_cached_roster = (None, None)
+
+def encoded_roster(df_processed):
+    """Get the RosterArrays for a DataFrame, building it only once.
+
+    The cache is keyed on the DataFrame object, so a DataFrame that is
+    modified in place after the first call needs a fresh copy to be re-encoded.
+    """
+    global _cached_roster
+    cached_df, roster = _cached_roster
+    if cached_df is not df_processed:
+        roster = RosterArrays(df_processed)
+        _cached_roster = (df_processed, roster)
+    return roster
+
+def predict_counter(model, pokemon_name, ability, df_processed, le_name, le_ability, top_n=5):
+    """Get the top counters for a Pokemon from the whole roster.
+
+    Scores every roster row as the counter of the target in a single
+    predict_proba call.
+    """
+    # Get encoded values (unknown names or abilities raise here)
+    pokemon_encoded = le_name.transform([pokemon_name])[0]
+    le_ability.transform([ability])
+
+    roster = encoded_roster(df_processed)
+    target = roster.first_row[pokemon_encoded]
+
+    # Every row as the counter, paired with the target's features
+    X_pred = np.hstack([roster.features, np.tile(roster.features[target], (len(roster), 1))])
+    predictions = model.predict_proba(X_pred)
+
+    # Get top counters
+    top_indices = np.argsort(predictions[:, 1])[-top_n:][::-1]
+
+    return df_processed.iloc[top_indices][['name', 'abilities', 'type1', 'type2', 'is_legendary']]